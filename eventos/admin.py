@@ -1,14 +1,247 @@
-from django.contrib import admin
-from .models import Sala, Evento
+import secrets
+
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from .models import Edificio, Sala, Evento, EventoArchivado, Equipo, AsignacionEquipo, CambioEvento, Nota
+from .auditoria import diferencias, instantanea
+from .edificios import edificios_usuario, filtrar_por_edificio
+from .equipos import equipos_disponibles, liberar_equipos, mover_asignaciones
+from .estados import cambiar_estado_condicional
+
+
+class ConteoEstimadoPaginator(Paginator):
+    """Paginador que evita el ``COUNT(*)`` completo en tablas grandes.
+
+    Sin filtros aplicados usa la estimación de filas que PostgreSQL guarda en
+    ``pg_class``; si la tabla es pequeña, hay filtros o la base no es
+    PostgreSQL, se hace el conteo normal.
+    """
+    umbral = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            connection = connections[self.object_list.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                        [query.model._meta.db_table],
+                    )
+                    fila = cursor.fetchone()
+                if fila and fila[0] > self.umbral:
+                    return fila[0]
+        return super().count
+
+
+class AlcanceEdificioAdmin(admin.ModelAdmin):
+    """Muestra solo los registros de los edificios del usuario y limita las
+    opciones de edificio y sala en los formularios. Los filtros por edificio
+    usan ``RelatedOnlyFieldListFilter`` para no listar edificios ajenos."""
+    campo_edificio = 'edificio'
+
+    def get_queryset(self, request):
+        return filtrar_por_edificio(super().get_queryset(request), request.user, self.campo_edificio)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'edificio':
+            kwargs['queryset'] = filtrar_por_edificio(Edificio.objects.all(), request.user, 'id')
+        elif db_field.name == 'sala':
+            kwargs['queryset'] = filtrar_por_edificio(Sala.objects.all(), request.user)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+@admin.register(Edificio)
+class EdificioAdmin(AlcanceEdificioAdmin):
+    campo_edificio = 'id'
+    list_display = ('nombre', 'direccion')
+    search_fields = ('nombre',)
+    filter_horizontal = ('usuarios',)
+
 
 @admin.register(Sala)
-class SalaAdmin(admin.ModelAdmin):
-    list_display = ('nombre', 'activa')
+class SalaAdmin(AlcanceEdificioAdmin):
+    list_display = ('nombre', 'edificio', 'activa', 'enlace_kiosco')
+    list_select_related = ('edificio',)
     search_fields = ('nombre',)
-    list_filter = ('activa',)
+    list_filter = (('edificio', admin.RelatedOnlyFieldListFilter), 'activa')
+    readonly_fields = ('token_kiosco',)
+    actions = ('generar_token_kiosco',)
+
+    @admin.display(description='Kiosco')
+    def enlace_kiosco(self, obj):
+        if not obj.token_kiosco:
+            return '—'
+        url = reverse('kiosco_sala', args=[obj.pk]) + f'?token={obj.token_kiosco}'
+        return format_html('<a href="{}" target="_blank">Abrir</a>', url)
+
+    @admin.action(description='Generar nuevo token de kiosco')
+    def generar_token_kiosco(self, request, queryset):
+        # Se guarda una por una para que las señales invaliden la caché del kiosco.
+        for sala in queryset:
+            sala.token_kiosco = secrets.token_urlsafe(32)
+            sala.save(update_fields=['token_kiosco'])
+        self.message_user(request, f"Se generaron {queryset.count()} tokens de kiosco.")
+
+@admin.register(Equipo)
+class EquipoAdmin(admin.ModelAdmin):
+    list_display = ('numero', 'tipo', 'descripcion', 'activo')
+    search_fields = ('numero', 'descripcion')
+    list_filter = ('tipo', 'activo')
+
+class AsignacionEquipoFormSet(BaseInlineFormSet):
+    """Rechaza asignaciones que se traslapen con las de otro evento.
+
+    En PostgreSQL la restricción de exclusión lo impediría igual, pero con un
+    ``IntegrityError`` (error 500) en lugar de un error en el formulario. El
+    mismo equipo dos veces en un evento ya lo rechaza la restricción única
+    (evento, equipo).
+    """
+
+    def clean(self):
+        super().clean()
+        for form in self.forms:
+            datos = getattr(form, 'cleaned_data', None)
+            if not datos or datos.get('DELETE'):
+                continue
+            equipo, inicio, fin = datos.get('equipo'), datos.get('inicio'), datos.get('fin')
+            if not (equipo and inicio and fin):
+                continue
+            if fin <= inicio:
+                form.add_error('fin', "El fin debe ser posterior al inicio.")
+                continue
+            if form.has_changed() and not equipos_disponibles(
+                equipo.tipo, inicio, fin, excluir_evento=self.instance.pk
+            ).filter(pk=equipo.pk).exists():
+                form.add_error('equipo', f"{equipo} ya está asignado a otro evento en ese horario.")
+
+
+class AsignacionEquipoInline(admin.TabularInline):
+    model = AsignacionEquipo
+    formset = AsignacionEquipoFormSet
+    extra = 0
+    autocomplete_fields = ('equipo',)
 
 @admin.register(Evento)
-class EventoAdmin(admin.ModelAdmin):
+class EventoAdmin(AlcanceEdificioAdmin):
     list_display = ('nombre', 'fecha_hora', 'sala', 'estado', 'creado_por')
+    list_select_related = ('sala', 'creado_por')
+    search_fields = ('nombre', 'sala__nombre')
+    list_filter = (('edificio', admin.RelatedOnlyFieldListFilter), 'estado')
+    date_hierarchy = 'fecha_hora'
+    autocomplete_fields = ('sala', 'creado_por')
+    paginator = ConteoEstimadoPaginator
+    show_full_result_count = False
+    actions = ('marcar_finalizados', 'marcar_cancelados')
+    inlines = (AsignacionEquipoInline,)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Se hace después de guardar el inline para que las asignaciones
+        # editadas a mano también tomen el nuevo horario.
+        if change and 'fecha_hora' in form.changed_data:
+            faltantes = mover_asignaciones(form.instance)
+            if faltantes:
+                self.message_user(
+                    request,
+                    f"No hay {', '.join(faltantes)} libre en el nuevo horario; el evento quedó sin ese equipo.",
+                    messages.WARNING,
+                )
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # form.initial tiene los valores con los que se abrió el formulario.
+        cambios = diferencias(form.initial if change else {}, instantanea(obj))
+        if cambios:
+            request.auditoria.registrar(obj.pk, 'editar' if change else 'crear', cambios, usuario=request.user)
+
+    def _cambiar_estado(self, request, queryset, estado_destino, accion):
+        """Cambia el estado con el mismo UPDATE condicional del dashboard y lo
+        registra en la bitácora. Devuelve los ids que cambiaron."""
+        estados_previos = dict(queryset.exclude(estado=estado_destino).values_list('id', 'estado'))
+        estados_origen = [estado for estado, _nombre in Evento.ESTADO_CHOICES if estado != estado_destino]
+        ids = list(estados_previos)
+        cambiados = set()
+        for i in range(0, len(ids), 1000):
+            cambiados |= cambiar_estado_condicional(ids[i:i + 1000], estados_origen, estado_destino)
+        request.auditoria.registrar_transicion(
+            {evento_id: estados_previos[evento_id] for evento_id in cambiados},
+            estado_destino, accion, usuario=request.user,
+        )
+        return cambiados
+
+    @admin.action(description='Marcar como finalizados')
+    def marcar_finalizados(self, request, queryset):
+        cambiados = self._cambiar_estado(request, queryset, 'finalizado', 'finalizar')
+        self.message_user(request, f"{len(cambiados)} eventos finalizados.")
+
+    @admin.action(description='Marcar como cancelados')
+    def marcar_cancelados(self, request, queryset):
+        cambiados = self._cambiar_estado(request, queryset, 'cancelado', 'cancelar')
+        liberar_equipos(cambiados)
+        self.message_user(request, f"{len(cambiados)} eventos cancelados.")
+
+@admin.register(EventoArchivado)
+class EventoArchivadoAdmin(AlcanceEdificioAdmin):
+    """Consulta del historial archivado; los registros no se editan."""
+    campo_edificio = 'sala__edificio'
+    list_display = ('nombre', 'fecha_hora', 'sala', 'estado', 'creado_por', 'fecha_archivado')
+    list_select_related = ('sala', 'creado_por')
     search_fields = ('nombre', 'sala__nombre')
-    list_filter = ('estado', 'fecha_hora')
+    list_filter = (('sala__edificio', admin.RelatedOnlyFieldListFilter), 'estado')
+    date_hierarchy = 'fecha_hora'
+    paginator = ConteoEstimadoPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(CambioEvento)
+class CambioEventoAdmin(admin.ModelAdmin):
+    """Bitácora de solo lectura."""
+    list_display = ('evento_id', 'accion', 'usuario', 'fecha')
+    list_select_related = ('usuario',)
+    list_filter = ('accion',)
+    search_fields = ('=evento_id',)
+    date_hierarchy = 'fecha'
+    paginator = ConteoEstimadoPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        edificios = edificios_usuario(request.user)
+        if edificios is None:
+            return queryset
+        return queryset.filter(
+            Q(evento_id__in=Evento.objects.filter(edificio__in=edificios).values('id'))
+            | Q(evento_id__in=EventoArchivado.objects.filter(sala__edificio__in=edificios).values('id'))
+        )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(Nota)
+class NotaAdmin(admin.ModelAdmin):
+    list_display = ('titulo', 'creado_por', 'fecha_modificacion')
+    list_select_related = ('creado_por',)
+    search_fields = ('titulo',)
+    date_hierarchy = 'fecha_modificacion'
+    autocomplete_fields = ('creado_por',)
+    paginator = ConteoEstimadoPaginator
+    show_full_result_count = False
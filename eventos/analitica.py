@@ -0,0 +1,204 @@
+"""Cálculos de ocupación de salas sobre arreglos de NumPy.
+
+Los eventos se leen como columnas (``values_list``) y todo el cálculo se hace
+con operaciones vectorizadas, sin iterar sobre instancias de ``Evento``.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import BigIntegerField
+from django.db.models.functions import Cast, Extract
+from django.utils import timezone
+
+from .edificios import clave_edificios
+from .models import DURACION_EVENTO, Evento, EventoArchivado, Sala
+
+HORAS_SEMANA = 7 * 24
+SEGUNDOS_HORA = 3600
+# 1970-01-01 fue jueves (weekday() == 3).
+WEEKDAY_EPOCH = 3
+CACHE_TIMEOUT = 60 * 10
+EPOCA = datetime(1970, 1, 1)
+
+
+def calcular_ocupacion(salas, inicios, fines, n_salas, desde, hasta):
+    """Calcula la matriz de ocupación (sala × día de la semana × hora).
+
+    ``salas`` son índices 0..n_salas-1 y ``inicios``/``fines`` segundos en hora
+    local desde la época; ``desde``/``hasta`` delimitan el rango en el mismo
+    formato. Devuelve ``(ocupacion, pico, momento_pico)`` donde ``ocupacion``
+    es la fracción de cada hora ocupada (0..1) promediada sobre el rango.
+    """
+    inicios = np.clip(np.asarray(inicios, dtype=np.int64), desde, hasta)
+    fines = np.clip(np.asarray(fines, dtype=np.int64), desde, hasta)
+    salas = np.asarray(salas, dtype=np.int64)
+    validos = fines > inicios
+    salas, inicios, fines = salas[validos], inicios[validos], fines[validos]
+
+    ocupacion = np.zeros(n_salas * HORAS_SEMANA)
+    if len(inicios):
+        # Cada evento toca a lo sumo ``ancho`` horas consecutivas; se genera una
+        # matriz (eventos × ancho) con los segundos de traslape en cada hora.
+        hora_inicio = inicios // SEGUNDOS_HORA
+        hora_fin = -(-fines // SEGUNDOS_HORA)
+        ancho = int((hora_fin - hora_inicio).max())
+        horas = hora_inicio[:, None] + np.arange(ancho)
+        traslape = (
+            np.minimum(fines[:, None], (horas + 1) * SEGUNDOS_HORA)
+            - np.maximum(inicios[:, None], horas * SEGUNDOS_HORA)
+        ).clip(min=0)
+
+        celda = (
+            salas[:, None] * HORAS_SEMANA
+            + ((horas // 24 + WEEKDAY_EPOCH) % 7) * 24
+            + horas % 24
+        )
+        ocupacion = np.bincount(
+            celda.ravel(), weights=traslape.ravel(), minlength=n_salas * HORAS_SEMANA
+        )
+
+    # Cuántas veces aparece cada (día, hora) en el rango, para normalizar.
+    horas_rango = np.arange(desde // SEGUNDOS_HORA, -(-hasta // SEGUNDOS_HORA))
+    apariciones = np.bincount(
+        ((horas_rango // 24 + WEEKDAY_EPOCH) % 7) * 24 + horas_rango % 24,
+        minlength=HORAS_SEMANA,
+    )
+    ocupacion = ocupacion.reshape(n_salas, 7, 24) / SEGUNDOS_HORA
+    ocupacion = np.divide(
+        ocupacion, apariciones.reshape(7, 24),
+        out=np.zeros_like(ocupacion), where=apariciones.reshape(7, 24) > 0,
+    )
+
+    pico, momento_pico = concurrencia_maxima(inicios, fines)
+    return ocupacion, pico, momento_pico
+
+
+def concurrencia_maxima(inicios, fines):
+    """Máximo de eventos simultáneos (en todas las salas) y el instante en que ocurre."""
+    if not len(inicios):
+        return 0, None
+    tiempos = np.concatenate([inicios, fines])
+    deltas = np.concatenate([np.ones(len(inicios), np.int64), -np.ones(len(fines), np.int64)])
+    # Ante empates los fines (-1) van antes que los inicios para no contar
+    # como simultáneos dos eventos consecutivos.
+    orden = np.lexsort((deltas, tiempos))
+    acumulado = np.cumsum(deltas[orden])
+    posicion = int(acumulado.argmax())
+    return int(acumulado[posicion]), int(tiempos[orden][posicion])
+
+
+def _columnas(queryset):
+    """Arreglos ``(sala_id, inicio)`` con el inicio en segundos UTC desde la época.
+
+    En PostgreSQL la base devuelve directamente ``EXTRACT(EPOCH ...)``; en otros
+    motores (SQLite en desarrollo) se usa ``timestamp()`` de cada fecha.
+    """
+    if connection.vendor == 'postgresql':
+        filas = queryset.annotate(
+            segundos=Cast(Extract('fecha_hora', 'epoch', tzinfo=dt_timezone.utc), BigIntegerField())
+        ).values_list('sala_id', 'segundos')
+        columnas = np.array(list(filas), dtype=np.int64).reshape(-1, 2)
+        return columnas[:, 0], columnas[:, 1]
+
+    filas = list(queryset.values_list('sala_id', 'fecha_hora'))
+    sala_ids = np.fromiter((sala_id for sala_id, _fecha in filas), dtype=np.int64, count=len(filas))
+    inicios = np.fromiter((fecha.timestamp() for _sala, fecha in filas), dtype=np.int64, count=len(filas))
+    return sala_ids, inicios
+
+
+def _a_hora_local(segundos_utc, zona, desde, hasta):
+    """Pasa segundos UTC a segundos de hora local usando el desfase de cada fila.
+
+    Se buscan (hora por hora) los instantes en que cambia el desfase de ``zona``
+    entre ``desde`` y ``hasta`` (segundos UTC), de modo que los cambios de
+    horario de verano dentro del rango se respetan.
+    """
+    instantes, desfases = [], []
+    for segundo in range(desde - desde % SEGUNDOS_HORA, hasta + SEGUNDOS_HORA, SEGUNDOS_HORA):
+        desfase = int(datetime.fromtimestamp(segundo, zona).utcoffset().total_seconds())
+        if not desfases or desfase != desfases[-1]:
+            instantes.append(segundo)
+            desfases.append(desfase)
+    posicion = np.searchsorted(np.array(instantes), segundos_utc, side='right') - 1
+    return segundos_utc + np.array(desfases)[posicion.clip(min=0)]
+
+
+def _segundos_locales(fecha):
+    """Medianoche local de ``fecha`` en segundos desde la época."""
+    return int((datetime.combine(fecha, time.min) - EPOCA).total_seconds())
+
+
+def clave_ocupacion(desde, hasta, edificios=None):
+    return f"ocupacion_salas:{clave_edificios(edificios)}:{desde.isoformat()}:{hasta.isoformat()}"
+
+
+def ocupacion_salas(desde, hasta, edificios=None):
+    """Ocupación de las salas activas entre las fechas ``desde`` y ``hasta`` (inclusive).
+
+    Incluye los eventos archivados y excluye los cancelados. Con ``edificios``
+    (ids) solo considera las salas de esos edificios. El resultado se guarda en
+    caché por edificios y rango de fechas.
+    """
+    clave = clave_ocupacion(desde, hasta, edificios)
+    resultado = cache.get(clave)
+    if resultado is not None:
+        return resultado
+
+    zona = timezone.get_current_timezone()
+    inicio_rango = timezone.make_aware(datetime.combine(desde, time.min), zona)
+    fin_rango = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), time.min), zona)
+
+    salas = Sala.objects.filter(activa=True)
+    if edificios is not None:
+        salas = salas.filter(edificio__in=edificios)
+    salas = list(salas.order_by('nombre').values_list('id', 'nombre'))
+    ids_salas = np.array([sala_id for sala_id, _nombre in salas], dtype=np.int64)
+
+    filtro = {
+        'sala__activa': True,
+        'fecha_hora__gt': inicio_rango - DURACION_EVENTO,
+        'fecha_hora__lt': fin_rango,
+    }
+    eventos = Evento.objects.filter(**filtro)
+    archivados = EventoArchivado.objects.filter(**filtro)
+    if edificios is not None:
+        eventos = eventos.filter(edificio__in=edificios)
+        archivados = archivados.filter(sala__edificio__in=edificios)
+    salas_activos, inicios_activos = _columnas(eventos.exclude(estado='cancelado'))
+    salas_archivo, inicios_archivo = _columnas(archivados.exclude(estado='cancelado'))
+    sala_ids = np.concatenate([salas_activos, salas_archivo])
+    inicios = _a_hora_local(
+        np.concatenate([inicios_activos, inicios_archivo]), zona,
+        int((inicio_rango - DURACION_EVENTO).timestamp()), int(fin_rango.timestamp()),
+    )
+
+    # sala_id -> fila de la matriz; se descartan salas que no están en el reporte
+    # (por ejemplo, creadas entre las dos consultas).
+    tabla = np.full(max(ids_salas.max(initial=0), sala_ids.max(initial=0)) + 1, -1, dtype=np.int64)
+    tabla[ids_salas] = np.arange(len(ids_salas))
+    indices = tabla[sala_ids]
+    en_reporte = indices >= 0
+    indices, inicios = indices[en_reporte], inicios[en_reporte]
+    fines = inicios + int(DURACION_EVENTO.total_seconds())
+
+    ocupacion, pico, momento_pico = calcular_ocupacion(
+        indices, inicios, fines, len(salas),
+        _segundos_locales(desde), _segundos_locales(hasta + timedelta(days=1)),
+    )
+
+    promedio_salas = ocupacion.mean(axis=(1, 2)) if len(salas) else np.zeros(0)
+    resultado = {
+        'salas': [nombre for _id, nombre in salas],
+        'ocupacion': np.round(ocupacion * 100, 1).tolist(),
+        'promedio_salas': np.round(promedio_salas * 100, 1).tolist(),
+        'total_eventos': len(inicios),
+        'pico_concurrencia': pico,
+        'momento_pico': (
+            EPOCA + timedelta(seconds=momento_pico)
+            if momento_pico is not None else None
+        ),
+    }
+    cache.set(clave, resultado, CACHE_TIMEOUT)
+    return resultado
@@ -0,0 +1,54 @@
+"""Backend de autenticación que evita consultar ``auth_user`` y ``auth_group`` en cada petición.
+
+El usuario, los nombres de sus grupos y sus edificios se guardan en caché al
+primer acceso y se invalidan con las señales de ``eventos.signals`` cuando
+cambia el usuario, su pertenencia a grupos o edificios, o un grupo. Usa el
+alias de caché ``sesiones``, separado de las cachés de disponibilidad y kiosco.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+CACHE_ALIAS = 'sesiones'
+CACHE_TIMEOUT = 60 * 30
+
+
+def clave_usuario(user_id):
+    return f"auth:usuario:{user_id}"
+
+
+def invalidar_usuarios(user_ids):
+    caches[CACHE_ALIAS].delete_many([clave_usuario(user_id) for user_id in set(user_ids)])
+
+
+def nombres_grupos(user):
+    """Nombres de los grupos del usuario, usando los cargados por el backend si existen."""
+    grupos = getattr(user, 'nombres_grupos', None)
+    if grupos is None:
+        grupos = frozenset(user.groups.values_list('name', flat=True))
+        user.nombres_grupos = grupos
+    return grupos
+
+
+class CacheModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        cache = caches[CACHE_ALIAS]
+        clave = clave_usuario(user_id)
+        datos = cache.get(clave)
+        if datos is None:
+            usuario = super().get_user(user_id)
+            if usuario is None:
+                return None
+            datos = {
+                'usuario': usuario,
+                'grupos': frozenset(usuario.groups.values_list('name', flat=True)),
+                'edificios': frozenset(usuario.edificios.values_list('id', flat=True)),
+            }
+            cache.set(clave, datos, CACHE_TIMEOUT)
+
+        usuario = datos['usuario']
+        if not isinstance(usuario, get_user_model()) or not self.user_can_authenticate(usuario):
+            return None
+        usuario.nombres_grupos = datos['grupos']
+        usuario.ids_edificios = datos['edificios']
+        return usuario
@@ -0,0 +1,95 @@
+"""Mapas de ocupación diarios por sala para detectar choques desde el formulario.
+
+Cada sala y día se representa con 288 bloques de 5 minutos empaquetados en
+36 bytes (bit más significativo primero). Un bloque está marcado si algún
+evento vigente de la sala ocupa parte de él, usando la misma ventana que
+``EventoForm.clean``; el formulario solo avisa, la validación del servidor
+sigue siendo la que decide.
+"""
+import base64
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import DURACION_CONFLICTO, Evento
+
+MINUTOS_BLOQUE = 5
+BLOQUES_DIA = 24 * 60 // MINUTOS_BLOQUE
+CACHE_TIMEOUT = 60 * 60 * 24
+# Sin caché compartida la invalidación solo llega al worker que guardó el
+# evento; en los demás el mapa puede quedar desactualizado hasta que expire.
+CACHE_TIMEOUT_LOCAL = 60
+ESTADOS_LIBRES = ['finalizado', 'cancelado']
+
+
+def _clave_version(sala_id):
+    return f"disponibilidad:version:{sala_id}"
+
+
+def invalidar_disponibilidad(sala_ids):
+    """Invalida todos los días cacheados de las salas indicadas cambiando su versión."""
+    for sala_id in set(sala_ids):
+        clave = _clave_version(sala_id)
+        cache.add(clave, 0, None)
+        try:
+            cache.incr(clave)
+        except ValueError:
+            cache.set(clave, 1, None)
+
+
+def empaquetar(intervalos):
+    """Convierte intervalos ``(inicio, fin)`` en minutos del día a un bitmap de bloques."""
+    bits = bytearray(BLOQUES_DIA // 8)
+    for inicio, fin in intervalos:
+        primero = max(0, int(inicio) // MINUTOS_BLOQUE)
+        ultimo = min(BLOQUES_DIA, -(-int(fin) // MINUTOS_BLOQUE))
+        for bloque in range(primero, ultimo):
+            bits[bloque >> 3] |= 0x80 >> (bloque & 7)
+    return bytes(bits)
+
+
+def mapas_del_dia(fecha, sala_ids, excluir_evento=None):
+    """Devuelve ``{sala_id: bitmap en base64}`` para ``fecha``.
+
+    Cada (sala, día) se guarda en caché como la lista de intervalos de sus
+    eventos; las salas que faltan se leen en una sola consulta sobre el índice
+    (sala, fecha_hora). Si se indica ``excluir_evento`` (edición), ese evento
+    no cuenta como ocupación.
+    """
+    versiones = cache.get_many([_clave_version(sala_id) for sala_id in sala_ids])
+    claves = {
+        sala_id: f"disponibilidad:{sala_id}:{versiones.get(_clave_version(sala_id), 0)}:{fecha.isoformat()}"
+        for sala_id in sala_ids
+    }
+    en_cache = cache.get_many(claves.values())
+    intervalos = {
+        sala_id: en_cache[clave] for sala_id, clave in claves.items() if clave in en_cache
+    }
+
+    faltantes = [sala_id for sala_id in sala_ids if sala_id not in intervalos]
+    if faltantes:
+        zona = timezone.get_current_timezone()
+        inicio_dia = timezone.make_aware(datetime.combine(fecha, time.min), zona)
+        fin_dia = inicio_dia + timedelta(days=1)
+        nuevos = {sala_id: [] for sala_id in faltantes}
+        # Incluye eventos del día anterior cuya ventana termina después de medianoche.
+        eventos = Evento.objects.filter(
+            sala_id__in=faltantes,
+            fecha_hora__gt=inicio_dia - DURACION_CONFLICTO,
+            fecha_hora__lt=fin_dia,
+        ).exclude(estado__in=ESTADOS_LIBRES).values_list('id', 'sala_id', 'fecha_hora')
+        for evento_id, sala_id, fecha_hora in eventos:
+            inicio = (fecha_hora - inicio_dia).total_seconds() / 60
+            nuevos[sala_id].append((evento_id, inicio, inicio + DURACION_CONFLICTO.total_seconds() / 60))
+        timeout = CACHE_TIMEOUT if settings.CACHE_COMPARTIDA else CACHE_TIMEOUT_LOCAL
+        cache.set_many({claves[sala_id]: valor for sala_id, valor in nuevos.items()}, timeout)
+        intervalos.update(nuevos)
+
+    return {
+        sala_id: base64.b64encode(empaquetar(
+            (inicio, fin) for evento_id, inicio, fin in intervalos[sala_id] if evento_id != excluir_evento
+        )).decode()
+        for sala_id in sala_ids
+    }
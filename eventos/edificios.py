@@ -0,0 +1,31 @@
+"""Alcance por edificio: cada usuario ve solo las salas y eventos de sus edificios.
+
+Los superusuarios ven todos. Un usuario sin edificios asignados no ve ninguno.
+"""
+
+
+def edificios_usuario(user):
+    """Ids de los edificios del usuario, o ``None`` si puede ver todos.
+
+    Usa los cargados por ``CacheModelBackend`` si existen.
+    """
+    if user.is_superuser:
+        return None
+    ids = getattr(user, 'ids_edificios', None)
+    if ids is None:
+        ids = frozenset(user.edificios.values_list('id', flat=True))
+        user.ids_edificios = ids
+    return ids
+
+
+def filtrar_por_edificio(queryset, user, campo='edificio'):
+    """Restringe ``queryset`` a los edificios del usuario; ``campo`` apunta al edificio."""
+    ids = edificios_usuario(user)
+    if ids is None:
+        return queryset
+    return queryset.filter(**{f'{campo}__in': ids})
+
+
+def clave_edificios(ids):
+    """Fragmento de clave de caché para un conjunto de edificios (``None`` = todos)."""
+    return 'todos' if ids is None else ','.join(map(str, sorted(ids))) or 'ninguno'
@@ -0,0 +1,131 @@
+"""Asignación de laptops y proyectores a eventos."""
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+
+from .models import DURACION_EVENTO, AsignacionEquipo, Equipo, Evento
+
+
+def equipos_disponibles(tipo, inicio, fin, excluir_evento=None):
+    """Equipos activos de ``tipo`` libres en el intervalo [inicio, fin).
+
+    Se resuelve en una sola consulta con ``NOT EXISTS`` sobre el índice
+    (equipo, inicio, fin) de las asignaciones.
+    """
+    ocupados = AsignacionEquipo.objects.filter(
+        equipo=OuterRef('pk'),
+        inicio__lt=fin,
+        fin__gt=inicio,
+    )
+    if excluir_evento is not None:
+        ocupados = ocupados.exclude(evento_id=excluir_evento)
+    return Equipo.objects.filter(tipo=tipo, activo=True).filter(~Exists(ocupados))
+
+
+def hay_inventario(tipo):
+    """Indica si hay equipos de ``tipo`` registrados en el inventario."""
+    return Equipo.objects.filter(tipo=tipo, activo=True).exists()
+
+
+def asignar_equipos(evento, equipos):
+    """Sustituye las asignaciones de ``evento`` por ``equipos`` (dict tipo -> Equipo).
+
+    Si otro evento tomó el equipo elegido entre la validación y el guardado,
+    la restricción de la base lo rechaza y se intenta con el siguiente
+    disponible del mismo tipo. Devuelve el dict de equipos asignados.
+    """
+    inicio = evento.fecha_hora
+    fin = inicio + DURACION_EVENTO
+    asignados = {}
+
+    with transaction.atomic():
+        AsignacionEquipo.objects.filter(evento=evento).delete()
+        for tipo, equipo in equipos.items():
+            candidatos = [equipo] + list(
+                equipos_disponibles(tipo, inicio, fin, excluir_evento=evento.pk).exclude(pk=equipo.pk)[:5]
+            )
+            for candidato in candidatos:
+                try:
+                    with transaction.atomic():
+                        AsignacionEquipo.objects.create(
+                            evento=evento, equipo=candidato, inicio=inicio, fin=fin
+                        )
+                except IntegrityError:
+                    continue
+                asignados[tipo] = candidato
+                break
+    return asignados
+
+
+def liberar_equipos(evento_ids):
+    """Elimina las asignaciones de los eventos indicados (p. ej. al cancelarlos)."""
+    AsignacionEquipo.objects.filter(evento_id__in=evento_ids).delete()
+
+
+def _equipos_libres(evento, preferidos):
+    """Elige un equipo libre por tipo para el horario actual de ``evento``.
+
+    ``preferidos`` es un dict tipo -> número del equipo a conservar si sigue
+    libre (o ``None``). Devuelve ``(elegidos, faltantes)``: el dict
+    tipo -> Equipo y los tipos sin ningún equipo libre.
+    """
+    inicio = evento.fecha_hora
+    fin = inicio + DURACION_EVENTO
+    elegidos, faltantes = {}, []
+    for tipo, numero in preferidos.items():
+        disponibles = equipos_disponibles(tipo, inicio, fin, excluir_evento=evento.pk)
+        equipo = disponibles.filter(numero=numero).first() if numero else None
+        equipo = equipo or disponibles.first()
+        if equipo is None:
+            faltantes.append(tipo)
+        else:
+            elegidos[tipo] = equipo
+    return elegidos, faltantes
+
+
+def _guardar_equipos(evento, elegidos):
+    """Asigna ``elegidos`` y copia el número de la laptop al evento."""
+    asignados = asignar_equipos(evento, elegidos)
+    laptop = asignados.get('laptop')
+    if laptop and laptop.numero != evento.numero_laptop:
+        Evento.objects.filter(pk=evento.pk).update(numero_laptop=laptop.numero)
+        evento.numero_laptop = laptop.numero
+    return asignados
+
+
+def reasignar_equipos(eventos):
+    """Vuelve a asignar los equipos que requieren ``eventos`` (p. ej. al reactivarlos).
+
+    Se respeta el número de laptop anterior si sigue libre. Devuelve los ids
+    de los eventos para los que no quedó algún equipo libre; a esos no se les
+    asigna nada.
+    """
+    con_inventario = {tipo for tipo in ('laptop', 'proyector') if hay_inventario(tipo)}
+    sin_equipo = set()
+    for evento in eventos:
+        preferidos = {}
+        if evento.requiere_laptop and 'laptop' in con_inventario:
+            preferidos['laptop'] = evento.numero_laptop
+        if evento.requiere_proyector and 'proyector' in con_inventario:
+            preferidos['proyector'] = None
+        if not preferidos:
+            continue
+        elegidos, faltantes = _equipos_libres(evento, preferidos)
+        if faltantes or len(_guardar_equipos(evento, elegidos)) < len(elegidos):
+            liberar_equipos([evento.pk])
+            sin_equipo.add(evento.pk)
+    return sin_equipo
+
+
+def mover_asignaciones(evento):
+    """Ajusta las asignaciones de ``evento`` a su nuevo horario.
+
+    Cada equipo se conserva si sigue libre en el nuevo horario; si no, se
+    cambia por otro libre del mismo tipo. Devuelve los tipos que se quedaron
+    sin equipo.
+    """
+    preferidos = dict(evento.asignaciones.values_list('equipo__tipo', 'equipo__numero'))
+    if not preferidos:
+        return []
+    elegidos, faltantes = _equipos_libres(evento, preferidos)
+    asignados = _guardar_equipos(evento, elegidos)
+    return faltantes + [tipo for tipo in elegidos if tipo not in asignados]
@@ -0,0 +1,111 @@
+"""Motor de estados de los eventos.
+
+Se mantiene separado de las vistas para que los comandos de gestión que lo
+ejecutan (``actualizar_estados``) no importen formularios ni plantillas.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .auditoria import BufferAuditoria
+from .invalidacion import invalidar_salas
+from .models import DURACION_CONFLICTO, Evento
+
+
+def actualizar_estados_eventos(edificios=None):
+    """Actualiza automáticamente los estados de los eventos.
+
+    Con ``edificios`` (ids) solo revisa los eventos de esos edificios.
+    """
+    ahora = timezone.localtime()
+    hace_2_horas = ahora - timedelta(hours=2)
+    
+    transiciones = [
+        # Cambiar eventos programados a activo cuando empiecen
+        (ahora, 'programado', 'activo'),
+        # Cambiar eventos activos a finalizado después de 2 horas
+        (hace_2_horas, 'activo', 'finalizado'),
+    ]
+    
+    # Todos los cambios de esta ejecución se registran con un solo INSERT (executemany).
+    with BufferAuditoria() as auditoria:
+        for limite, estado_origen, estado_destino in transiciones:
+            pendientes = Evento.objects.filter(
+                fecha_hora__lte=limite,
+                estado=estado_origen
+            )
+            if edificios is not None:
+                pendientes = pendientes.filter(edificio__in=edificios)
+            pendientes = list(pendientes.values_list('id', flat=True))
+            for i in range(0, len(pendientes), 1000):
+                cambiados = cambiar_estado_condicional(pendientes[i:i + 1000], [estado_origen], estado_destino)
+                auditoria.registrar_transicion(dict.fromkeys(cambiados, estado_origen), estado_destino, 'automatico')
+
+# Transiciones permitidas en el cambio masivo: acción -> (estados de origen, estado destino)
+TRANSICIONES_MASIVAS = {
+    'finalizar': (['programado', 'activo'], 'finalizado'),
+    'cancelar': (['programado', 'activo'], 'cancelado'),
+    'reactivar': (['finalizado', 'cancelado'], 'programado'),
+}
+
+def cambiar_estado_condicional(ids, estados_origen, estado_destino):
+    """Cambia el estado de los eventos indicados que estén en ``estados_origen``.
+
+    Se ejecuta como un único ``UPDATE ... WHERE estado IN (...)`` y devuelve el
+    conjunto de ids que realmente cambiaron. Invalida las cachés (kiosco y
+    disponibilidad) de las salas afectadas.
+    """
+    if not ids:
+        return set()
+    if connection.vendor in ('postgresql', 'sqlite'):
+        tabla = connection.ops.quote_name(Evento._meta.db_table)
+        marcas_estados = ', '.join(['%s'] * len(estados_origen))
+        marcas_ids = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {tabla} SET estado = %s "
+                f"WHERE estado IN ({marcas_estados}) AND id IN ({marcas_ids}) RETURNING id, sala_id",
+                [estado_destino, *estados_origen, *ids],
+            )
+            filas = cursor.fetchall()
+    else:
+        # Motores sin RETURNING: bloquear las filas afectadas y actualizarlas.
+        with transaction.atomic():
+            filas = list(Evento.objects.select_for_update().filter(
+                id__in=ids, estado__in=estados_origen
+            ).values_list('id', 'sala_id'))
+            Evento.objects.filter(id__in=[evento_id for evento_id, _sala in filas]).update(estado=estado_destino)
+
+    invalidar_salas(sala_id for _id, sala_id in filas)
+    return {evento_id for evento_id, _sala in filas}
+
+def ids_en_conflicto(ids):
+    """Ids de ``ids`` cuyo horario choca con un evento vigente de la misma sala.
+
+    Usa la misma regla que ``EventoForm.clean``. Los eventos se revisan en orden
+    de fecha y los que pasan la revisión cuentan como ocupados para los
+    siguientes, así no se reactivan dos eventos que chocan entre sí.
+    """
+    candidatos = sorted(Evento.objects.filter(id__in=ids).values_list('fecha_hora', 'id', 'sala_id'))
+    if not candidatos:
+        return set()
+
+    ocupados = defaultdict(list)
+    vigentes = Evento.objects.filter(
+        sala_id__in={sala_id for _fecha, _id, sala_id in candidatos},
+        fecha_hora__gte=candidatos[0][0] - DURACION_CONFLICTO,
+        fecha_hora__lt=candidatos[-1][0] + DURACION_CONFLICTO,
+    ).exclude(estado__in=['finalizado', 'cancelado']).exclude(id__in=ids)
+    for sala_id, fecha_hora in vigentes.values_list('sala_id', 'fecha_hora'):
+        ocupados[sala_id].append(fecha_hora)
+
+    conflictos = set()
+    for fecha_hora, evento_id, sala_id in candidatos:
+        inicio, fin = fecha_hora - DURACION_CONFLICTO, fecha_hora + DURACION_CONFLICTO
+        if any(inicio <= otro < fin for otro in ocupados[sala_id]):
+            conflictos.add(evento_id)
+        else:
+            ocupados[sala_id].append(fecha_hora)
+    return conflictos
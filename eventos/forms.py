@@ -1,8 +1,9 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from datetime import timedelta
-from .models import Evento, Nota
+from .models import DURACION_CONFLICTO, DURACION_EVENTO, Equipo, Evento, Nota, Sala
+from .equipos import asignar_equipos, equipos_disponibles, hay_inventario
+from .edificios import filtrar_por_edificio
 
 class EventoForm(forms.ModelForm):
     class Meta:
@@ -23,6 +24,12 @@ class EventoForm(forms.ModelForm):
             'estado': forms.HiddenInput(),
         }
 
+    def __init__(self, *args, usuario=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Solo se pueden elegir salas de los edificios del usuario.
+        if usuario is not None:
+            self.fields['sala'].queryset = filtrar_por_edificio(Sala.objects.all(), usuario)
+
     def clean(self):
         cleaned_data = super().clean()
         fecha_hora = cleaned_data.get("fecha_hora")
@@ -30,7 +37,7 @@ class EventoForm(forms.ModelForm):
 
         if fecha_hora and sala:
             # Definimos la duración del evento (1 hora y 58 minutos para dar un margen)
-            duracion_evento = timedelta(hours=1, minutes=58)
+            duracion_evento = DURACION_CONFLICTO
             fin_evento = fecha_hora + duracion_evento
 
             # Buscamos eventos que se superpongan en la misma sala.
@@ -56,8 +63,54 @@ class EventoForm(forms.ModelForm):
                     f"Hay un conflicto con el evento '{conflicto.nombre}' programado a las {timezone.localtime(conflicto.fecha_hora).strftime('%H:%M') }."
                 )
 
+        if fecha_hora:
+            self._elegir_equipos(cleaned_data, fecha_hora)
+
         return cleaned_data
 
+    def _elegir_equipos(self, cleaned_data, fecha_hora):
+        """Elige una laptop y/o un proyector libres para el horario del evento.
+
+        Si el usuario escribió un número de laptop se respeta cuando está libre.
+        Los tipos sin equipos en el inventario se omiten y conservan el
+        comportamiento anterior (solo el número en texto libre).
+        """
+        self.equipos_elegidos = {}
+        fin_evento = fecha_hora + DURACION_EVENTO
+        evento_id = self.instance.pk if self.instance else None
+        requeridos = [
+            ('laptop', 'Laptop', cleaned_data.get('requiere_laptop')),
+            ('proyector', 'Proyector', cleaned_data.get('requiere_proyector')),
+        ]
+
+        for tipo, nombre, requerido in requeridos:
+            if not requerido or not hay_inventario(tipo):
+                continue
+            disponibles = equipos_disponibles(tipo, fecha_hora, fin_evento, excluir_evento=evento_id)
+
+            numero = cleaned_data.get('numero_laptop') if tipo == 'laptop' else None
+            if numero:
+                equipo = disponibles.filter(numero=numero).first()
+                if equipo is None and Equipo.objects.filter(tipo=tipo, numero=numero, activo=True).exists():
+                    raise ValidationError(f"La laptop #{numero} ya está asignada a otro evento en ese horario.")
+                equipo = equipo or disponibles.first()
+            else:
+                equipo = disponibles.first()
+
+            if equipo is None:
+                raise ValidationError(f"No hay ningún equipo '{nombre}' disponible en ese horario.")
+            self.equipos_elegidos[tipo] = equipo
+            if tipo == 'laptop':
+                cleaned_data['numero_laptop'] = equipo.numero
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        asignados = asignar_equipos(self.instance, getattr(self, 'equipos_elegidos', {}))
+        laptop = asignados.get('laptop')
+        if laptop and laptop.numero != self.instance.numero_laptop:
+            Evento.objects.filter(pk=self.instance.pk).update(numero_laptop=laptop.numero)
+            self.instance.numero_laptop = laptop.numero
+
 class NotaForm(forms.ModelForm):
     class Meta:
         model = Nota
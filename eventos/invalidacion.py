@@ -0,0 +1,9 @@
+from .disponibilidad import invalidar_disponibilidad
+from .kiosco import invalidar_kiosco
+
+
+def invalidar_salas(sala_ids):
+    """Descarta las cachés que dependen de los eventos de las salas indicadas."""
+    sala_ids = set(sala_ids)
+    invalidar_kiosco(sala_ids)
+    invalidar_disponibilidad(sala_ids)
@@ -0,0 +1,87 @@
+"""Datos para las pantallas de kiosco de cada sala (evento actual y siguiente).
+
+Cada sala tiene una entrada de caché con su nombre, su token y el estado
+actual ya serializado; se invalida cuando cambian los eventos de la sala.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import DURACION_EVENTO, Evento, Sala
+
+CACHE_MAXIMO = 300
+
+
+def clave_cache(sala_id):
+    return f"kiosco:sala:{sala_id}"
+
+
+def invalidar_kiosco(sala_ids):
+    """Descarta la caché de kiosco de las salas indicadas."""
+    cache.delete_many([clave_cache(sala_id) for sala_id in set(sala_ids)])
+
+
+def _serializar(evento):
+    if evento is None:
+        return None
+    return {
+        'id': evento['id'],
+        'nombre': evento['nombre'],
+        'inicio': timezone.localtime(evento['fecha_hora']),
+        'fin': timezone.localtime(evento['fecha_hora'] + DURACION_EVENTO),
+        'estado': evento['estado'],
+    }
+
+
+def estado_sala(sala_id):
+    """Devuelve ``{'nombre', 'edificio', 'token', 'json', 'etag'}`` de la sala o ``None`` si no existe."""
+    clave = clave_cache(sala_id)
+    datos = cache.get(clave)
+    if datos is not None:
+        return datos
+
+    sala = Sala.objects.filter(id=sala_id, activa=True).values('nombre', 'edificio_id', 'token_kiosco').first()
+    if sala is None:
+        return None
+
+    ahora = timezone.now()
+    # Una sola consulta sobre el índice (sala, fecha_hora): el evento en curso
+    # (si lo hay) y el siguiente.
+    proximos = list(Evento.objects.filter(
+        sala_id=sala_id,
+        fecha_hora__gt=ahora - DURACION_EVENTO,
+        estado__in=['programado', 'activo'],
+    ).order_by('fecha_hora').values('id', 'nombre', 'fecha_hora', 'estado')[:2])
+
+    actual = proximos.pop(0) if proximos and proximos[0]['fecha_hora'] <= ahora else None
+    siguiente = proximos[0] if proximos else None
+
+    contenido = json.dumps({
+        'sala': sala['nombre'],
+        'actual': _serializar(actual),
+        'siguiente': _serializar(siguiente),
+    }, cls=DjangoJSONEncoder)
+
+    # La entrada expira sola en el siguiente cambio previsible (fin del evento
+    # actual o inicio del siguiente).
+    limites = []
+    if actual:
+        limites.append(actual['fecha_hora'] + DURACION_EVENTO)
+    if siguiente:
+        limites.append(siguiente['fecha_hora'])
+    timeout = CACHE_MAXIMO
+    if limites:
+        timeout = max(1, min(CACHE_MAXIMO, int((min(limites) - ahora).total_seconds()) + 1))
+
+    datos = {
+        'nombre': sala['nombre'],
+        'edificio': sala['edificio_id'],
+        'token': sala['token_kiosco'],
+        'json': contenido,
+        'etag': '"%s"' % hashlib.md5(contenido.encode()).hexdigest(),
+    }
+    cache.set(clave, datos, timeout)
+    return datos
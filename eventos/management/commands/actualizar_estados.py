@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from eventos.estados import actualizar_estados_eventos
+
+
+class Command(BaseCommand):
+    help = (
+        "Pasa los eventos a activo o finalizado según la hora actual. Pensado para "
+        "ejecutarse desde cron con el perfil ligero (DJANGO_PERFIL=lote)."
+    )
+    # Sin comprobaciones del sistema: cargarían URLs, vistas y admin en cada ejecución.
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        actualizar_estados_eventos()
@@ -0,0 +1,66 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from eventos.models import AsignacionEquipo, Evento, EventoArchivado
+
+ESTADOS_ARCHIVABLES = ['finalizado', 'cancelado']
+
+CAMPOS = [
+    'id', 'nombre', 'fecha_hora', 'sala_id', 'observaciones',
+    'requiere_laptop', 'requiere_proyector', 'numero_laptop',
+    'estado', 'creado_por_id', 'fecha_creacion',
+]
+
+
+class Command(BaseCommand):
+    help = "Mueve los eventos finalizados o cancelados antiguos a la tabla de archivo."
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=90,
+                            help='Antigüedad mínima (en días) de los eventos a archivar.')
+        parser.add_argument('--lote', type=int, default=1000,
+                            help='Número de eventos movidos por transacción.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo muestra cuántos eventos se archivarían.')
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['dias'])
+        pendientes = Evento.objects.filter(
+            estado__in=ESTADOS_ARCHIVABLES,
+            fecha_hora__lt=limite,
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f"Se archivarían {pendientes.count()} eventos anteriores a {limite:%Y-%m-%d}.")
+            return
+
+        total = 0
+        while True:
+            # Cada lote se copia y se borra en la misma transacción para que un
+            # evento nunca exista en ambas tablas ni se pierda a medio camino.
+            with transaction.atomic():
+                filas = list(pendientes.order_by('pk').values(*CAMPOS)[:options['lote']])
+                if not filas:
+                    break
+                ids = [fila['id'] for fila in filas]
+                # Las asignaciones se borran en cascada con el evento; se
+                # conserva qué equipos usó.
+                equipos = defaultdict(list)
+                for evento_id, tipo, numero in AsignacionEquipo.objects.filter(
+                    evento_id__in=ids,
+                ).order_by('equipo__tipo', 'equipo__numero').values_list('evento_id', 'equipo__tipo', 'equipo__numero'):
+                    equipos[evento_id].append({'tipo': tipo, 'numero': numero})
+                # Sin ignore_conflicts: si un id ya estuviera archivado, el lote
+                # falla y se revierte en lugar de borrar el evento sin copiarlo.
+                EventoArchivado.objects.bulk_create([
+                    EventoArchivado(**fila, equipos=equipos[fila['id']]) for fila in filas
+                ])
+                Evento.objects.filter(pk__in=ids).delete()
+            total += len(filas)
+
+        self.stdout.write(self.style.SUCCESS(f"{total} eventos archivados."))
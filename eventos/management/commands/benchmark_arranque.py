@@ -0,0 +1,116 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+# Arranca Django en un proceso nuevo y atiende una sola petición WSGI.
+PRIMERA_PETICION = """
+from wsgiref.util import setup_testing_defaults
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+environ = {'PATH_INFO': %r}
+setup_testing_defaults(environ)
+estado = []
+b''.join(application(environ, lambda status, headers: estado.append(status)))
+print(estado[0])
+"""
+
+# Perfil de importación de la configuración, las apps y las URLs. -X importtime
+# solo registra las sentencias import, así que import_module (con el que Django
+# carga la configuración y las apps) se redirige a __import__.
+IMPORTACION = """
+import importlib
+import sys
+_import_module = importlib.import_module
+def import_module(name, package=None):
+    if package or name.startswith('.'):
+        return _import_module(name, package)
+    __import__(name)
+    return sys.modules[name]
+importlib.import_module = import_module
+import django
+from django.conf import settings
+django.setup()
+importlib.import_module(settings.ROOT_URLCONF)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el arranque en procesos nuevos: perfil de importación (-X importtime), "
+        "tiempo hasta la primera petición y duración de los comandos por lotes con "
+        "la configuración normal y con el perfil ligero (DJANGO_PERFIL=lote)."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--url', default='/login/')
+
+    def handle(self, *args, **options):
+        self.manage = str(settings.BASE_DIR / 'manage.py')
+        self.repeticiones = options['repeticiones']
+
+        self._perfil_importacion()
+
+        self.stdout.write("\nTiempo hasta la primera petición (mediana):")
+        self._medir(f"GET {options['url']}", ['-c', PRIMERA_PETICION % options['url']])
+
+        self.stdout.write("\nComandos de gestión (mediana):")
+        self._medir('actualizar_estados', [self.manage, 'actualizar_estados'])
+        self._medir('actualizar_estados (lote)', [self.manage, 'actualizar_estados'], lote=True)
+        self._medir('check', [self.manage, 'check'])
+
+        executor = MigrationExecutor(connection)
+        if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            self.stdout.write("Hay migraciones pendientes; no se mide migrate.")
+            return
+        self._medir('migrate', [self.manage, 'migrate', '-v0'])
+        self._medir('migrar_si_hay_pendientes', [self.manage, 'migrar_si_hay_pendientes', '-v0'])
+
+    def _entorno(self, lote=False):
+        entorno = dict(os.environ)
+        entorno.pop('DJANGO_PERFIL', None)
+        if lote:
+            entorno['DJANGO_PERFIL'] = 'lote'
+        return entorno
+
+    def _medir(self, nombre, argumentos, lote=False):
+        tiempos = []
+        for _ in range(self.repeticiones):
+            inicio = time.perf_counter()
+            subprocess.run(
+                [sys.executable, *argumentos], env=self._entorno(lote),
+                check=True, stdout=subprocess.DEVNULL,
+            )
+            tiempos.append(time.perf_counter() - inicio)
+        self.stdout.write(f"  {nombre:<30} {statistics.median(tiempos) * 1000:8.1f} ms")
+
+    def _perfil_importacion(self):
+        resultado = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', IMPORTACION],
+            env=self._entorno(), check=True, capture_output=True, text=True,
+        )
+        acumulado = {}
+        for linea in resultado.stderr.splitlines():
+            if not linea.startswith('import time:') or 'cumulative' in linea:
+                continue
+            _propio, total, modulo = linea[len('import time:'):].split('|')
+            acumulado.setdefault(modulo.strip(), int(total) / 1000)
+
+        modulos = [
+            'django', os.environ['DJANGO_SETTINGS_MODULE'],
+            *(app.rsplit('.apps.', 1)[0] for app in settings.INSTALLED_APPS),
+            'django.contrib.admin.sites', 'eventos.admin',
+            'eventos.views', 'eventos.forms', settings.ROOT_URLCONF,
+        ]
+        self.stdout.write("Perfil de importación (acumulado, primera importación):")
+        for modulo in dict.fromkeys(modulos):
+            if modulo in acumulado:
+                self.stdout.write(f"  {modulo:<40} {acumulado[modulo]:8.1f} ms")
@@ -0,0 +1,91 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from eventos import views
+from eventos.models import Edificio, Sala
+
+
+class AuditoriaNula:
+    def registrar(self, *args, **kwargs):
+        pass
+
+
+class SinAuditoriaMiddleware:
+    """Sustituye a ``AuditoriaMiddleware``: la vista recibe un registro que no hace nada."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.auditoria = AuditoriaNula()
+        return self.get_response(request)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el tiempo de crear_evento con y sin bitácora de cambios. Sin "
+        "bitácora no se toma la instantánea, no se calculan diferencias ni se "
+        "escribe nada. Todo se ejecuta dentro de una transacción que se revierte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            tiempos = self._medir(options['peticiones'])
+            transaction.set_rollback(True)
+
+        con, sin = statistics.median(tiempos['con']), statistics.median(tiempos['sin'])
+        self.stdout.write(
+            f"crear_evento: mediana sin bitácora {sin * 1000:.2f} ms, "
+            f"con bitácora {con * 1000:.2f} ms, sobrecosto {(con - sin) / sin * 100:+.1f}%"
+        )
+
+    def _medir(self, peticiones):
+        usuario = User.objects.create_superuser('benchmark_auditoria', '', None)
+        edificio = Edificio.objects.create(nombre='Edificio benchmark auditoría')
+        sala = Sala.objects.create(nombre='Sala benchmark auditoría', edificio=edificio)
+
+        clientes = {'con': Client(), 'sin': Client()}
+        middleware_sin = [
+            f'{__name__}.SinAuditoriaMiddleware' if ruta == 'eventos.middleware.AuditoriaMiddleware' else ruta
+            for ruta in settings.MIDDLEWARE
+        ]
+        with override_settings(MIDDLEWARE=middleware_sin):
+            clientes['sin'].handler.load_middleware()
+        for cliente in clientes.values():
+            cliente.force_login(usuario)
+
+        inicio = timezone.localtime() + timedelta(days=3650)
+        tiempos = {'con': [], 'sin': []}
+        instantanea, diferencias = views.instantanea, views.diferencias
+        try:
+            for i in range(peticiones):
+                # Alternar para que ambas variantes vean el mismo estado de la base.
+                for variante in ('con', 'sin'):
+                    if variante == 'con':
+                        views.instantanea, views.diferencias = instantanea, diferencias
+                    else:
+                        views.instantanea = views.diferencias = lambda *args: {}
+                    fecha = inicio + timedelta(hours=3 * (2 * i + (variante == 'sin')))
+                    datos = {
+                        'nombre': f'Benchmark {i}',
+                        'fecha_hora': fecha.strftime('%Y-%m-%dT%H:%M'),
+                        'sala': sala.pk,
+                        'estado': 'programado',
+                    }
+                    t0 = time.perf_counter()
+                    clientes[variante].post('/crear/', datos, HTTP_HOST='localhost')
+                    tiempos[variante].append(time.perf_counter() - t0)
+        finally:
+            views.instantanea, views.diferencias = instantanea, diferencias
+        return tiempos
@@ -0,0 +1,56 @@
+import time
+
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+# eventos_edificio_usuarios: los edificios del usuario (alcance por edificio).
+TABLAS_AUTENTICACION = ('django_session', 'auth_user', 'auth_group', 'eventos_edificio_usuarios')
+
+
+class Command(BaseCommand):
+    help = (
+        "Cuenta las consultas de sesión y usuario por petición (primera petición y "
+        "estado estable). Se ejecuta en una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=50)
+        parser.add_argument('--url', default='/calendario/')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._medir(options['peticiones'], options['url'])
+            transaction.set_rollback(True)
+
+    def _medir(self, peticiones, url):
+        # Un gestor (no staff) obliga a consultar sus grupos en es_gestor_o_admin.
+        usuario = User.objects.create_user('benchmark_autenticacion', password='benchmark')
+        usuario.groups.add(Group.objects.get_or_create(name='Gestor de Eventos')[0])
+        cliente = Client(HTTP_HOST='localhost')
+        cliente.login(username='benchmark_autenticacion', password='benchmark')
+
+        resultados = []
+        for _ in range(peticiones):
+            with CaptureQueriesContext(connection) as consultas:
+                inicio = time.perf_counter()
+                cliente.get(url)
+                duracion = time.perf_counter() - inicio
+            de_autenticacion = sum(
+                1 for consulta in consultas.captured_queries
+                if any(f'"{tabla}' in consulta['sql'] for tabla in TABLAS_AUTENTICACION)
+            )
+            resultados.append((de_autenticacion, len(consultas.captured_queries), duracion))
+
+        primera = resultados[0]
+        estables = resultados[1:] or resultados
+        self.stdout.write(
+            f"Primera petición: {primera[0]} consultas de sesión/usuario de {primera[1]} en total"
+        )
+        self.stdout.write(
+            f"Estado estable: {max(r[0] for r in estables)} consultas de sesión/usuario "
+            f"(máximo en {len(estables)} peticiones), "
+            f"{sorted(r[2] for r in estables)[len(estables) // 2] * 1000:.2f} ms por petición"
+        )
@@ -0,0 +1,87 @@
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from eventos.analitica import calcular_ocupacion, clave_ocupacion, ocupacion_salas
+from eventos.models import DURACION_EVENTO, Edificio, Evento, Sala
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el reporte de ocupación de extremo a extremo (consulta, conversión y "
+        "cálculo) sobre eventos sembrados en la base, y el cálculo solo. Los datos se "
+        "crean en una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salas', type=int, default=200)
+        parser.add_argument('--dias', type=int, default=365)
+        parser.add_argument('--eventos-por-dia', type=int, default=4,
+                            help='Eventos promedio por sala y día.')
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._medir(options)
+            transaction.set_rollback(True)
+
+    def _medir(self, options):
+        rng = np.random.default_rng(0)
+        n_salas, dias = options['salas'], options['dias']
+        n_eventos = n_salas * dias * options['eventos_por_dia']
+
+        # Inicios entre las 7:00 y las 20:00, en bloques de 15 minutos.
+        dia = rng.integers(0, dias, n_eventos)
+        minuto = rng.integers(7 * 4, 20 * 4, n_eventos) * 15
+        sala = rng.integers(0, n_salas, n_eventos)
+
+        hasta = timezone.localdate()
+        desde = hasta - timedelta(days=dias - 1)
+        inicio = timezone.make_aware(datetime.combine(desde, datetime.min.time()))
+
+        edificio = Edificio.objects.create(nombre='Edificio benchmark ocupación')
+        salas = Sala.objects.bulk_create(
+            [Sala(nombre=f'Sala {i:03d}', edificio=edificio) for i in range(n_salas)]
+        )
+        usuario = User.objects.create_user('benchmark_ocupacion')
+        self.stdout.write(f"Sembrando {n_eventos} eventos...")
+        Evento.objects.bulk_create(
+            (
+                Evento(
+                    nombre='Benchmark', sala=salas[s], edificio=edificio, creado_por=usuario,
+                    fecha_hora=inicio + timedelta(days=int(d), minutes=int(m)), estado='finalizado',
+                )
+                for d, m, s in zip(dia, minuto, sala)
+            ),
+            batch_size=5000,
+        )
+
+        edificios = [edificio.id]
+        tiempos = []
+        for _ in range(options['repeticiones']):
+            cache.delete(clave_ocupacion(desde, hasta, edificios))
+            t = time.perf_counter()
+            datos = ocupacion_salas(desde, hasta, edificios)
+            tiempos.append(time.perf_counter() - t)
+        self.stdout.write(
+            f"ocupacion_salas ({datos['total_eventos']} eventos, {n_salas} salas, {dias} días): "
+            f"mejor {min(tiempos) * 1000:.1f} ms, mediana {np.median(tiempos) * 1000:.1f} ms"
+        )
+
+        inicios = dia * 86400 + minuto * 60
+        fines = inicios + int(DURACION_EVENTO.total_seconds())
+        tiempos = []
+        for _ in range(options['repeticiones']):
+            t = time.perf_counter()
+            calcular_ocupacion(sala, inicios, fines, n_salas, 0, dias * 86400)
+            tiempos.append(time.perf_counter() - t)
+        self.stdout.write(
+            f"solo calcular_ocupacion: mejor {min(tiempos) * 1000:.1f} ms, "
+            f"mediana {np.median(tiempos) * 1000:.1f} ms"
+        )
@@ -0,0 +1,52 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from eventos.recordatorios import enviar_resumenes
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el renderizado y envío de resúmenes con el backend locmem. Las marcas "
+        "de idempotencia se escriben dentro de una transacción que se revierte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--destinatarios', type=int, default=10000)
+        parser.add_argument('--eventos', type=int, default=5, help='Eventos por resumen.')
+        parser.add_argument('--presupuesto', type=float, default=10.0,
+                            help='Tiempo máximo aceptable en segundos.')
+
+    def handle(self, *args, **options):
+        fecha = timezone.localdate() + timedelta(days=1)
+        eventos = [
+            {'hora': f"{9 + i:02d}:00", 'nombre': f"Evento {i}", 'sala': f"Sala {i}", 'equipo': 'Proyector'}
+            for i in range(options['eventos'])
+        ]
+        resumenes = [
+            {
+                'clave': f"benchmark:{i}",
+                'destinatario': f"usuario{i}@example.com",
+                'saludo': f"usuario{i}",
+                'por_sala': False,
+                'grupos': [('', eventos)],
+            }
+            for i in range(options['destinatarios'])
+        ]
+
+        connection = get_connection('django.core.mail.backends.locmem.EmailBackend')
+        with transaction.atomic():
+            inicio = time.perf_counter()
+            enviados = enviar_resumenes(resumenes, fecha, connection=connection)
+            duracion = time.perf_counter() - inicio
+            transaction.set_rollback(True)
+
+        estilo = self.style.SUCCESS if duracion <= options['presupuesto'] else self.style.ERROR
+        self.stdout.write(estilo(
+            f"{enviados} resúmenes en {duracion:.2f} s "
+            f"({enviados / duracion:.0f}/s, presupuesto {options['presupuesto']:.0f} s)"
+        ))
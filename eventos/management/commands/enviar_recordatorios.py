@@ -0,0 +1,36 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from eventos.recordatorios import construir_resumenes, enviar_resumenes
+
+
+class Command(BaseCommand):
+    help = (
+        "Envía por correo el resumen de eventos del día siguiente a sus creadores "
+        "y el resumen por sala al personal. Es seguro ejecutarlo varias veces."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', help='Fecha de los eventos (AAAA-MM-DD). Por defecto, mañana.')
+        parser.add_argument('--lote', type=int, default=100, help='Correos por lote.')
+        parser.add_argument('--dry-run', action='store_true', help='Solo muestra cuántos correos se enviarían.')
+
+    def handle(self, *args, **options):
+        if options['fecha']:
+            try:
+                fecha = date.fromisoformat(options['fecha'])
+            except ValueError:
+                raise CommandError("La fecha debe tener el formato AAAA-MM-DD.")
+        else:
+            fecha = timezone.localdate() + timedelta(days=1)
+
+        resumenes = construir_resumenes(fecha)
+        if options['dry_run']:
+            self.stdout.write(f"Se enviarían {len(resumenes)} resúmenes para el {fecha}.")
+            return
+
+        enviados = enviar_resumenes(resumenes, fecha, lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f"{enviados} resúmenes enviados para el {fecha}."))
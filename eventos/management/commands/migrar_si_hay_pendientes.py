@@ -0,0 +1,26 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta migrate solo si hay migraciones pendientes. Evita en cada arranque "
+        "del contenedor las comprobaciones y la señal post_migrate (tipos de "
+        "contenido y permisos) cuando la base ya está al día."
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        conexion = connections[options['database']]
+        executor = MigrationExecutor(conexion)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if not plan:
+            self.stdout.write("Sin migraciones pendientes.")
+            return
+        self.stdout.write(f"{len(plan)} migraciones pendientes; ejecutando migrate.")
+        call_command('migrate', database=options['database'], verbosity=options['verbosity'])
@@ -0,0 +1,14 @@
+from .auditoria import BufferAuditoria
+
+
+class AuditoriaMiddleware:
+    """Expone ``request.auditoria`` y guarda sus registros al terminar la petición."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.auditoria = BufferAuditoria()
+        response = self.get_response(request)
+        request.auditoria.guardar()
+        return response
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0003_nota_color'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoArchivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=200)),
+                ('fecha_hora', models.DateTimeField(db_index=True)),
+                ('observaciones', models.TextField(blank=True)),
+                ('requiere_laptop', models.BooleanField(default=False)),
+                ('requiere_proyector', models.BooleanField(default=False)),
+                ('numero_laptop', models.CharField(blank=True, max_length=50, null=True)),
+                ('estado', models.CharField(choices=[('programado', 'Programado'), ('activo', 'Activo'), ('finalizado', 'Finalizado'), ('cancelado', 'Cancelado')], max_length=20)),
+                ('fecha_creacion', models.DateTimeField()),
+                ('fecha_archivado', models.DateTimeField(auto_now_add=True)),
+                ('creado_por', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos_archivados', to=settings.AUTH_USER_MODEL)),
+                ('sala', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos_archivados', to='eventos.sala')),
+            ],
+            options={
+                'verbose_name': 'evento archivado',
+                'verbose_name_plural': 'eventos archivados',
+                'ordering': ['-fecha_hora'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0004_eventoarchivado'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['fecha_hora'], name='evento_fecha_hora_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['estado', 'fecha_hora'], name='evento_estado_fecha_idx'),
+        ),
+    ]
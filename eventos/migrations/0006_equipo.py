@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def crear_exclusion_traslapes(apps, schema_editor):
+    # Solo PostgreSQL soporta restricciones de exclusión; en otros motores la
+    # validación queda en eventos.equipos.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    schema_editor.execute(
+        "ALTER TABLE eventos_asignacionequipo "
+        "ADD CONSTRAINT asignacion_equipo_sin_traslape "
+        "EXCLUDE USING gist (equipo_id WITH =, tstzrange(inicio, fin) WITH &&)"
+    )
+
+
+def eliminar_exclusion_traslapes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "ALTER TABLE eventos_asignacionequipo "
+        "DROP CONSTRAINT IF EXISTS asignacion_equipo_sin_traslape"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0005_evento_indices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Equipo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('laptop', 'Laptop'), ('proyector', 'Proyector')], max_length=20)),
+                ('numero', models.CharField(max_length=50)),
+                ('descripcion', models.CharField(blank=True, max_length=200)),
+                ('activo', models.BooleanField(default=True)),
+            ],
+            options={
+                'ordering': ['tipo', 'numero'],
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'numero'), name='equipo_tipo_numero_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AsignacionEquipo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('inicio', models.DateTimeField()),
+                ('fin', models.DateTimeField()),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asignaciones', to='eventos.evento')),
+                ('equipo', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='asignaciones', to='eventos.equipo')),
+            ],
+            options={
+                'ordering': ['inicio'],
+                'indexes': [models.Index(fields=['equipo', 'inicio', 'fin'], name='asignacion_equipo_rango_idx')],
+                'constraints': [models.UniqueConstraint(fields=('evento', 'equipo'), name='asignacion_evento_equipo_unica')],
+            },
+        ),
+        migrations.RunPython(crear_exclusion_traslapes, eliminar_exclusion_traslapes),
+    ]
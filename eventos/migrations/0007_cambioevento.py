@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:57
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0006_equipo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CambioEvento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('evento_id', models.BigIntegerField()),
+                ('accion', models.CharField(choices=[('crear', 'Creación'), ('editar', 'Edición'), ('finalizar', 'Finalización'), ('cancelar', 'Cancelación'), ('reactivar', 'Reactivación'), ('automatico', 'Cambio automático')], max_length=20)),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+                ('cambios', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-fecha', '-id'],
+                'indexes': [models.Index(fields=['evento_id', '-fecha'], name='cambio_evento_fecha_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0007_cambioevento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sala',
+            name='token_kiosco',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['sala', 'fecha_hora'], name='evento_sala_fecha_idx'),
+        ),
+    ]
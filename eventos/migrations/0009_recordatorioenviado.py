@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0008_kiosco'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordatorioEnviado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=200, unique=True)),
+                ('fecha_envio', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
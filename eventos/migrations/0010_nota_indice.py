@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0009_recordatorioenviado'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='nota',
+            index=models.Index(fields=['creado_por', '-fecha_modificacion', '-id'], name='nota_usuario_modif_idx'),
+        ),
+    ]
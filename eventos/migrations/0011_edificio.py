@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def asignar_edificio_principal(apps, schema_editor):
+    """Pone las salas existentes en un edificio y le asigna a todos los usuarios.
+
+    Así una instalación con un solo edificio sigue funcionando igual después de
+    migrar; los edificios adicionales se dan de alta en el admin.
+    """
+    Edificio = apps.get_model('eventos', 'Edificio')
+    Sala = apps.get_model('eventos', 'Sala')
+    Evento = apps.get_model('eventos', 'Evento')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    if not Sala.objects.exists():
+        return
+    edificio = Edificio.objects.create(nombre='Edificio principal')
+    Sala.objects.update(edificio=edificio)
+    Evento.objects.update(edificio=edificio)
+    edificio.usuarios.set(User.objects.values_list('pk', flat=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0010_nota_indice'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Edificio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True)),
+                ('direccion', models.CharField(blank=True, max_length=200)),
+                ('usuarios', models.ManyToManyField(blank=True, related_name='edificios', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.AddField(
+            model_name='sala',
+            name='edificio',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='salas', to='eventos.edificio'),
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='edificio',
+            field=models.ForeignKey(null=True, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='eventos', to='eventos.edificio'),
+        ),
+        migrations.RunPython(asignar_edificio_principal, migrations.RunPython.noop),
+    ]
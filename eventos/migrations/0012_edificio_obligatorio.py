@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Separada de 0011: PostgreSQL no permite alterar una tabla con cambios de
+# llaves foráneas pendientes de verificar en la misma transacción.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0011_edificio'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sala',
+            name='edificio',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='salas', to='eventos.edificio'),
+        ),
+        migrations.AlterField(
+            model_name='evento',
+            name='edificio',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='eventos', to='eventos.edificio'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['edificio', 'fecha_hora'], name='evento_edificio_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['edificio', 'estado', 'fecha_hora'], name='evento_edif_estado_fecha_idx'),
+        ),
+    ]
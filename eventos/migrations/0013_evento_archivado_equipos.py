@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0012_edificio_obligatorio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventoarchivado',
+            name='equipos',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
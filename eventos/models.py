@@ -1,11 +1,36 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
+from datetime import timedelta
+
+# Duración de referencia de un evento; coincide con el paso automático a
+# 'finalizado' que hace actualizar_estados_eventos.
+DURACION_EVENTO = timedelta(hours=2)
+# Ventana usada para detectar choques de horario en una sala (1 hora y 58
+# minutos para dar un margen entre eventos consecutivos).
+DURACION_CONFLICTO = timedelta(hours=1, minutes=58)
+
+class Edificio(models.Model):
+    nombre = models.CharField(max_length=100, unique=True)
+    direccion = models.CharField(max_length=200, blank=True)
+    # Personal que ve y gestiona los eventos del edificio. Los superusuarios
+    # ven todos los edificios.
+    usuarios = models.ManyToManyField(User, blank=True, related_name='edificios')
+
+    class Meta:
+        ordering = ['nombre']
+
+    def __str__(self):
+        return self.nombre
 
 class Sala(models.Model):
+    edificio = models.ForeignKey(Edificio, on_delete=models.PROTECT, related_name='salas')
     nombre = models.CharField(max_length=100)
     descripcion = models.TextField(blank=True)
     activa = models.BooleanField(default=True)
+    # Token de solo lectura para la pantalla de kiosco de la sala.
+    token_kiosco = models.CharField(max_length=64, blank=True, default='')
     
     def __str__(self):
         return self.nombre
@@ -21,6 +46,9 @@ class Evento(models.Model):
     nombre = models.CharField(max_length=200)
     fecha_hora = models.DateTimeField()
     sala = models.ForeignKey(Sala, on_delete=models.CASCADE)
+    # Copia de sala.edificio para que las consultas por edificio usen sus
+    # propios índices; se asigna en save() y al mover una sala de edificio.
+    edificio = models.ForeignKey(Edificio, on_delete=models.PROTECT, editable=False, related_name='eventos')
     observaciones = models.TextField(blank=True)
     
     requiere_laptop = models.BooleanField(default=False)
@@ -34,9 +62,21 @@ class Evento(models.Model):
     
     class Meta:
         ordering = ['fecha_hora']
+        indexes = [
+            models.Index(fields=['fecha_hora'], name='evento_fecha_hora_idx'),
+            models.Index(fields=['estado', 'fecha_hora'], name='evento_estado_fecha_idx'),
+            models.Index(fields=['sala', 'fecha_hora'], name='evento_sala_fecha_idx'),
+            models.Index(fields=['edificio', 'fecha_hora'], name='evento_edificio_fecha_idx'),
+            models.Index(fields=['edificio', 'estado', 'fecha_hora'], name='evento_edif_estado_fecha_idx'),
+        ]
     
     def __str__(self):
         return f"{self.nombre} - {self.fecha_hora.strftime('%Y-%m-%d %H:%M')}"
+
+    def save(self, *args, **kwargs):
+        if self.sala_id is not None:
+            self.edificio_id = self.sala.edificio_id
+        super().save(*args, **kwargs)
     
     @property
     def es_hoy(self):
@@ -44,10 +84,91 @@ class Evento(models.Model):
     
     @property
     def es_manana(self):
-        from datetime import timedelta
         manana = timezone.now().date() + timedelta(days=1)
         return self.fecha_hora.date() == manana
 
+class Equipo(models.Model):
+    TIPO_CHOICES = [
+        ('laptop', 'Laptop'),
+        ('proyector', 'Proyector'),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    numero = models.CharField(max_length=50)
+    descripcion = models.CharField(max_length=200, blank=True)
+    activo = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ['tipo', 'numero']
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'numero'], name='equipo_tipo_numero_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.numero}"
+
+class AsignacionEquipo(models.Model):
+    """Reserva de un equipo para un evento durante [inicio, fin).
+
+    En PostgreSQL una restricción de exclusión (ver la migración 0006) impide
+    que un mismo equipo tenga dos asignaciones que se traslapen.
+    """
+    evento = models.ForeignKey(Evento, on_delete=models.CASCADE, related_name='asignaciones')
+    equipo = models.ForeignKey(Equipo, on_delete=models.PROTECT, related_name='asignaciones')
+    inicio = models.DateTimeField()
+    fin = models.DateTimeField()
+
+    class Meta:
+        ordering = ['inicio']
+        indexes = [
+            models.Index(fields=['equipo', 'inicio', 'fin'], name='asignacion_equipo_rango_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['evento', 'equipo'], name='asignacion_evento_equipo_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.equipo} → {self.evento}"
+
+class CambioEvento(models.Model):
+    """Registro de solo inserción con los cambios hechos a un evento.
+
+    ``evento_id`` no es llave foránea para que el historial se conserve cuando
+    el evento se archiva o se elimina.
+    """
+    ACCION_CHOICES = [
+        ('crear', 'Creación'),
+        ('editar', 'Edición'),
+        ('finalizar', 'Finalización'),
+        ('cancelar', 'Cancelación'),
+        ('reactivar', 'Reactivación'),
+        ('automatico', 'Cambio automático'),
+    ]
+
+    evento_id = models.BigIntegerField()
+    accion = models.CharField(max_length=20, choices=ACCION_CHOICES)
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    fecha = models.DateTimeField(auto_now_add=True)
+    # {campo: [antes, después]}
+    cambios = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    class Meta:
+        ordering = ['-fecha', '-id']
+        indexes = [
+            models.Index(fields=['evento_id', '-fecha'], name='cambio_evento_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_accion_display()} del evento {self.evento_id} ({self.fecha:%Y-%m-%d %H:%M})"
+
+class RecordatorioEnviado(models.Model):
+    """Marca de idempotencia: un resumen ya enviado no se vuelve a enviar."""
+    clave = models.CharField(max_length=200, unique=True)
+    fecha_envio = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.clave
+
 class Nota(models.Model):
     COLOR_CHOICES = [
         ('#009885', 'Verde'),
@@ -69,7 +190,46 @@ class Nota(models.Model):
     
     class Meta:
         ordering = ['-fecha_modificacion']
+        indexes = [
+            models.Index(
+                fields=['creado_por', '-fecha_modificacion', '-id'],
+                name='nota_usuario_modif_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.titulo
 
+
+class EventoArchivado(models.Model):
+    """Eventos finalizados o cancelados movidos fuera de la tabla principal.
+
+    Conserva el mismo ``id`` que tenía en ``Evento`` para que el historial
+    siga siendo rastreable. Se llena con ``manage.py archivar_eventos``.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    nombre = models.CharField(max_length=200)
+    fecha_hora = models.DateTimeField(db_index=True)
+    sala = models.ForeignKey(Sala, on_delete=models.CASCADE, related_name='eventos_archivados')
+    observaciones = models.TextField(blank=True)
+
+    requiere_laptop = models.BooleanField(default=False)
+    requiere_proyector = models.BooleanField(default=False)
+
+    numero_laptop = models.CharField(max_length=50, blank=True, null=True)
+    # Equipos que tenía asignados: [{"tipo": ..., "numero": ...}]. Las
+    # asignaciones se borran junto con el evento original.
+    equipos = models.JSONField(default=list, blank=True)
+
+    estado = models.CharField(max_length=20, choices=Evento.ESTADO_CHOICES)
+    creado_por = models.ForeignKey(User, on_delete=models.CASCADE, related_name='eventos_archivados')
+    fecha_creacion = models.DateTimeField()
+    fecha_archivado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-fecha_hora']
+        verbose_name = 'evento archivado'
+        verbose_name_plural = 'eventos archivados'
+
+    def __str__(self):
+        return f"{self.nombre} - {self.fecha_hora.strftime('%Y-%m-%d %H:%M')}"
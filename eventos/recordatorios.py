@@ -0,0 +1,154 @@
+"""Resúmenes por correo de los eventos del día siguiente.
+
+Se leen los eventos en una sola consulta y se agrupan por creador y por sala;
+los correos se envían por lotes sobre una única conexión y cada resumen
+enviado deja una marca en ``RecordatorioEnviado`` para no repetirlo.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import Edificio, Evento, RecordatorioEnviado
+
+PLANTILLA = 'eventos/email/recordatorio.txt'
+DIAS_SEMANA = ['lunes', 'martes', 'miércoles', 'jueves', 'viernes', 'sábado', 'domingo']
+MESES = ['', 'enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
+         'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre']
+
+
+@lru_cache(maxsize=None)
+def plantilla():
+    """Plantilla compilada una sola vez por proceso."""
+    return get_template(PLANTILLA)
+
+
+def fecha_en_texto(fecha):
+    return f"{DIAS_SEMANA[fecha.weekday()]} {fecha.day} de {MESES[fecha.month]}"
+
+
+def _resumen_evento(evento):
+    equipo = []
+    if evento.requiere_laptop:
+        equipo.append(f"Laptop{' #' + evento.numero_laptop if evento.numero_laptop else ''}")
+    if evento.requiere_proyector:
+        equipo.append('Proyector')
+    return {
+        'hora': timezone.localtime(evento.fecha_hora).strftime('%H:%M'),
+        'nombre': evento.nombre,
+        'sala': evento.sala.nombre,
+        'equipo': ', '.join(equipo),
+    }
+
+
+def _grupos_por_sala(por_edificio, edificios, nombres_edificio):
+    """Grupos ``(sala, eventos)`` de ``edificios``; si son varios, el título
+    incluye el nombre del edificio."""
+    grupos = []
+    for edificio_id in sorted(edificios, key=nombres_edificio.get):
+        for sala, lista in sorted(por_edificio[edificio_id].items()):
+            titulo = f"{nombres_edificio[edificio_id]} · {sala}" if len(edificios) > 1 else sala
+            grupos.append((titulo, lista))
+    return grupos
+
+
+def construir_resumenes(fecha):
+    """Devuelve la lista de resúmenes pendientes para ``fecha``.
+
+    Cada resumen es un dict con ``clave``, ``destinatario``, ``saludo``,
+    ``por_sala`` y ``grupos`` (lista de ``(título, eventos)``). Los resúmenes
+    por sala se envían al personal (staff) con correo registrado y solo
+    incluyen las salas de sus edificios; los superusuarios reciben todas.
+    """
+    zona = timezone.get_current_timezone()
+    inicio = timezone.make_aware(datetime.combine(fecha, time.min), zona)
+    eventos = Evento.objects.filter(
+        fecha_hora__gte=inicio,
+        fecha_hora__lt=inicio + timedelta(days=1),
+        estado='programado',
+    ).select_related('sala', 'edificio', 'creado_por').order_by('fecha_hora')
+
+    por_creador = defaultdict(list)
+    por_edificio = defaultdict(lambda: defaultdict(list))
+    nombres_edificio = {}
+    for evento in eventos:
+        resumen = _resumen_evento(evento)
+        por_creador[evento.creado_por].append(resumen)
+        por_edificio[evento.edificio_id][evento.sala.nombre].append(resumen)
+        nombres_edificio[evento.edificio_id] = evento.edificio.nombre
+
+    resumenes = []
+    for usuario, lista in por_creador.items():
+        if usuario.email:
+            resumenes.append({
+                'clave': f"{fecha.isoformat()}:creador:{usuario.pk}",
+                'destinatario': usuario.email,
+                'saludo': usuario.first_name or usuario.username,
+                'por_sala': False,
+                'grupos': [('', lista)],
+            })
+
+    if por_edificio:
+        personal = User.objects.filter(is_staff=True, is_active=True).exclude(email='')
+        edificios_personal = defaultdict(set)
+        for usuario_id, edificio_id in Edificio.usuarios.through.objects.filter(
+            edificio_id__in=list(por_edificio), user__in=personal,
+        ).values_list('user_id', 'edificio_id'):
+            edificios_personal[usuario_id].add(edificio_id)
+
+        # Muchos usuarios comparten los mismos edificios: los grupos se arman una vez.
+        grupos_por_edificios = {}
+        for usuario in personal.only('pk', 'email', 'first_name', 'username', 'is_superuser'):
+            edificios = frozenset(por_edificio if usuario.is_superuser else edificios_personal[usuario.pk])
+            if not edificios:
+                continue
+            if edificios not in grupos_por_edificios:
+                grupos_por_edificios[edificios] = _grupos_por_sala(por_edificio, edificios, nombres_edificio)
+            resumenes.append({
+                'clave': f"{fecha.isoformat()}:salas:{usuario.pk}",
+                'destinatario': usuario.email,
+                'saludo': usuario.first_name or usuario.username,
+                'por_sala': True,
+                'grupos': grupos_por_edificios[edificios],
+            })
+
+    enviados = set(RecordatorioEnviado.objects.filter(
+        clave__startswith=f"{fecha.isoformat()}:"
+    ).values_list('clave', flat=True))
+    return [resumen for resumen in resumenes if resumen['clave'] not in enviados]
+
+
+def renderizar(resumen, fecha):
+    """Construye el ``EmailMessage`` de un resumen."""
+    cuerpo = plantilla().render({**resumen, 'fecha_texto': fecha_en_texto(fecha)})
+    asunto = f"Eventos programados para el {fecha_en_texto(fecha)}"
+    return EmailMessage(asunto, cuerpo, settings.DEFAULT_FROM_EMAIL, [resumen['destinatario']])
+
+
+def enviar_resumenes(resumenes, fecha, lote=100, connection=None, marcar=True):
+    """Envía los resúmenes por lotes sobre una sola conexión y devuelve cuántos se enviaron.
+
+    Tras cada lote enviado se guardan sus marcas de idempotencia; si el proceso
+    se interrumpe, una nueva ejecución continúa con los lotes pendientes.
+    """
+    connection = connection or get_connection()
+    enviados = 0
+    connection.open()
+    try:
+        for i in range(0, len(resumenes), lote):
+            grupo = resumenes[i:i + lote]
+            connection.send_messages([renderizar(resumen, fecha) for resumen in grupo])
+            if marcar:
+                RecordatorioEnviado.objects.bulk_create(
+                    [RecordatorioEnviado(clave=resumen['clave']) for resumen in grupo],
+                    ignore_conflicts=True,
+                )
+            enviados += len(grupo)
+    finally:
+        connection.close()
+    return enviados
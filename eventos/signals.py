@@ -0,0 +1,85 @@
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .backends import invalidar_usuarios
+from .invalidacion import invalidar_salas
+from .models import Edificio, Evento, Sala
+
+
+@receiver(pre_save, sender=Evento)
+def recordar_sala_anterior(sender, instance, **kwargs):
+    # Si el evento cambia de sala hay que invalidar también la sala anterior.
+    if instance.pk:
+        instance._sala_anterior_id = (
+            Evento.objects.filter(pk=instance.pk).values_list('sala_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Evento)
+@receiver(post_delete, sender=Evento)
+def invalidar_kiosco_evento(sender, instance, **kwargs):
+    salas = [instance.sala_id]
+    if getattr(instance, '_sala_anterior_id', None):
+        salas.append(instance._sala_anterior_id)
+    invalidar_salas(salas)
+
+
+@receiver(post_save, sender=Sala)
+@receiver(post_delete, sender=Sala)
+def invalidar_kiosco_sala(sender, instance, **kwargs):
+    invalidar_salas([instance.pk])
+
+
+@receiver(post_save, sender=Sala)
+def mover_eventos_de_edificio(sender, instance, created, update_fields, **kwargs):
+    # Mantiene la copia Evento.edificio cuando la sala cambia de edificio.
+    if created or (update_fields is not None and 'edificio' not in update_fields):
+        return
+    Evento.objects.filter(sala=instance).exclude(edificio_id=instance.edificio_id).update(
+        edificio_id=instance.edificio_id
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_usuario(sender, instance, **kwargs):
+    invalidar_usuarios([instance.pk])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidar_grupos_usuario(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # user.groups.add/remove/clear: ``instance`` es el usuario.
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidar_usuarios([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        # group.user_set.add/remove: ``pk_set`` son los usuarios.
+        invalidar_usuarios(pk_set)
+    elif action == 'pre_clear':
+        # group.user_set.clear(): se invalida antes de perder la relación.
+        invalidar_usuarios(instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidar_miembros_grupo(sender, instance, **kwargs):
+    invalidar_usuarios(instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=Edificio.usuarios.through)
+def invalidar_edificios_usuario(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # user.edificios.add/remove/clear: ``instance`` es el usuario.
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidar_usuarios([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        # edificio.usuarios.add/remove: ``pk_set`` son los usuarios.
+        invalidar_usuarios(pk_set)
+    elif action == 'pre_clear':
+        invalidar_usuarios(instance.usuarios.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Edificio)
+def invalidar_usuarios_edificio(sender, instance, **kwargs):
+    invalidar_usuarios(instance.usuarios.values_list('pk', flat=True))
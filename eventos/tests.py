@@ -1,3 +1,465 @@
-from django.test import TestCase
+import base64
+import time
+from io import StringIO
+from datetime import date, datetime, timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import Group, Permission, User
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .analitica import ocupacion_salas
+from .backends import CACHE_ALIAS, CacheModelBackend, clave_usuario
+from .disponibilidad import empaquetar, mapas_del_dia
+from .kiosco import clave_cache
+from .forms import EventoForm
+from .models import DURACION_EVENTO, AsignacionEquipo, CambioEvento, Edificio, Equipo, Evento, EventoArchivado, Sala
+from .recordatorios import construir_resumenes, enviar_resumenes
+
+
+class DatosBase(TestCase):
+    """Un edificio con una sala y un superusuario con sesión iniciada."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.edificio = Edificio.objects.create(nombre='Edificio A')
+        cls.sala = Sala.objects.create(nombre='Sala A1', edificio=cls.edificio)
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.manana = timezone.localtime().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    def crear_evento(self, sala=None, fecha_hora=None, **campos):
+        return Evento.objects.create(
+            nombre=campos.pop('nombre', 'Evento'),
+            sala=sala or self.sala,
+            fecha_hora=fecha_hora or self.manana,
+            creado_por=self.admin,
+            **campos,
+        )
+
+
+class CambioEstadoMasivoTests(DatosBase):
+    def test_reactivar_no_duplica_la_sala(self):
+        cancelado = self.crear_evento(estado='cancelado')
+        self.crear_evento(nombre='Nueva reserva', fecha_hora=self.manana + timedelta(minutes=30))
+
+        respuesta = self.client.post('/eventos/estado/', {'accion': 'reactivar', 'ids': [cancelado.id]})
+
+        self.assertEqual(respuesta.json()['resultados'], {str(cancelado.id): 'conflicto'})
+        cancelado.refresh_from_db()
+        self.assertEqual(cancelado.estado, 'cancelado')
+
+    def test_reactivar_dos_eventos_que_chocan_entre_si(self):
+        primero = self.crear_evento(estado='cancelado')
+        segundo = self.crear_evento(estado='finalizado', fecha_hora=self.manana + timedelta(hours=1))
+
+        respuesta = self.client.post('/eventos/estado/', {'accion': 'reactivar', 'ids': [primero.id, segundo.id]})
+
+        self.assertEqual(respuesta.json()['resultados'], {
+            str(primero.id): 'actualizado',
+            str(segundo.id): 'conflicto',
+        })
+
+
+class EquiposTests(DatosBase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.laptop = Equipo.objects.create(tipo='laptop', numero='L1')
+
+    def asignar(self, evento, equipo):
+        AsignacionEquipo.objects.create(
+            evento=evento, equipo=equipo, inicio=evento.fecha_hora, fin=evento.fecha_hora + DURACION_EVENTO
+        )
+
+    def test_reactivar_vuelve_a_asignar_los_equipos(self):
+        cancelado = self.crear_evento(estado='cancelado', requiere_laptop=True, numero_laptop='L1')
+
+        respuesta = self.client.post('/eventos/estado/', {'accion': 'reactivar', 'ids': [cancelado.id]})
+
+        self.assertEqual(respuesta.json()['resultados'], {str(cancelado.id): 'actualizado'})
+        self.assertEqual(list(cancelado.asignaciones.values_list('equipo__numero', flat=True)), ['L1'])
+
+    def test_reactivar_sin_equipo_libre(self):
+        otra_sala = Sala.objects.create(nombre='Sala A2', edificio=self.edificio)
+        self.asignar(self.crear_evento(sala=otra_sala, requiere_laptop=True), self.laptop)
+        cancelado = self.crear_evento(estado='cancelado', requiere_laptop=True)
+
+        respuesta = self.client.post('/eventos/estado/', {'accion': 'reactivar', 'ids': [cancelado.id]})
+
+        self.assertEqual(respuesta.json()['resultados'], {str(cancelado.id): 'sin_equipo'})
+        cancelado.refresh_from_db()
+        self.assertEqual(cancelado.estado, 'cancelado')
+        self.assertFalse(cancelado.asignaciones.exists())
+
+    def guardar_en_admin(self, evento, fecha_hora, asignaciones):
+        """Envía el formulario de cambio del admin con ``asignaciones`` (lista de
+        ``(asignación o None, equipo, inicio, fin)``) en el inline."""
+        fecha_hora = timezone.localtime(fecha_hora)
+        datos = {
+            'nombre': evento.nombre,
+            'fecha_hora_0': fecha_hora.strftime('%Y-%m-%d'),
+            'fecha_hora_1': fecha_hora.strftime('%H:%M:%S'),
+            'sala': evento.sala_id,
+            'requiere_laptop': 'on',
+            'numero_laptop': 'L1',
+            'estado': 'programado',
+            'creado_por': self.admin.id,
+            'asignaciones-TOTAL_FORMS': len(asignaciones),
+            'asignaciones-INITIAL_FORMS': sum(1 for asignacion, *_resto in asignaciones if asignacion),
+        }
+        for i, (asignacion, equipo, inicio, fin) in enumerate(asignaciones):
+            inicio, fin = timezone.localtime(inicio), timezone.localtime(fin)
+            datos.update({
+                f'asignaciones-{i}-id': asignacion.id if asignacion else '',
+                f'asignaciones-{i}-evento': evento.id,
+                f'asignaciones-{i}-equipo': equipo.id,
+                f'asignaciones-{i}-inicio_0': inicio.strftime('%Y-%m-%d'),
+                f'asignaciones-{i}-inicio_1': inicio.strftime('%H:%M:%S'),
+                f'asignaciones-{i}-fin_0': fin.strftime('%Y-%m-%d'),
+                f'asignaciones-{i}-fin_1': fin.strftime('%H:%M:%S'),
+            })
+        return self.client.post(f'/admin/eventos/evento/{evento.id}/change/', datos)
+
+    def test_admin_mueve_las_asignaciones_con_el_evento(self):
+        evento = self.crear_evento(requiere_laptop=True, numero_laptop='L1')
+        self.asignar(evento, self.laptop)
+        asignacion = evento.asignaciones.get()
+        nueva = self.manana + timedelta(days=1)
+
+        respuesta = self.guardar_en_admin(
+            evento, nueva, [(asignacion, self.laptop, asignacion.inicio, asignacion.fin)]
+        )
+
+        self.assertEqual(respuesta.status_code, 302)
+        asignacion = evento.asignaciones.get()
+        self.assertEqual(asignacion.equipo, self.laptop)
+        self.assertEqual(asignacion.inicio, nueva)
+        self.assertEqual(asignacion.fin, nueva + DURACION_EVENTO)
+
+    def test_admin_rechaza_asignaciones_traslapadas(self):
+        otra_sala = Sala.objects.create(nombre='Sala A2', edificio=self.edificio)
+        self.asignar(self.crear_evento(sala=otra_sala, requiere_laptop=True), self.laptop)
+        evento = self.crear_evento(requiere_laptop=True)
+        fin = self.manana + DURACION_EVENTO
+
+        respuesta = self.guardar_en_admin(evento, self.manana, [(None, self.laptop, self.manana, fin)])
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertContains(respuesta, 'ya está asignado a otro evento')
+        self.assertFalse(evento.asignaciones.exists())
+
+class AuditoriaAdminTests(DatosBase):
+    def test_acciones_del_admin_quedan_en_la_bitacora(self):
+        evento = self.crear_evento()
+        ya_cancelado = self.crear_evento(estado='cancelado', fecha_hora=self.manana + timedelta(hours=2))
+
+        self.client.post('/admin/eventos/evento/', {
+            'action': 'marcar_cancelados', '_selected_action': [evento.id, ya_cancelado.id],
+        })
+
+        # Solo el evento que realmente cambió queda registrado.
+        cambio = CambioEvento.objects.get()
+        self.assertEqual((cambio.evento_id, cambio.accion, cambio.usuario), (evento.id, 'cancelar', self.admin))
+        self.assertEqual(cambio.cambios, {'estado': ['programado', 'cancelado']})
+
+    def test_edicion_en_el_admin_queda_en_la_bitacora(self):
+        evento = self.crear_evento()
+        fecha = timezone.localtime(evento.fecha_hora)
+
+        self.client.post(f'/admin/eventos/evento/{evento.id}/change/', {
+            'nombre': 'Renombrado',
+            'fecha_hora_0': fecha.strftime('%Y-%m-%d'),
+            'fecha_hora_1': fecha.strftime('%H:%M:%S'),
+            'sala': self.sala.id,
+            'estado': 'programado',
+            'creado_por': self.admin.id,
+            'asignaciones-TOTAL_FORMS': 0,
+            'asignaciones-INITIAL_FORMS': 0,
+        })
+
+        cambio = CambioEvento.objects.get()
+        self.assertEqual((cambio.evento_id, cambio.accion), (evento.id, 'editar'))
+        self.assertEqual(cambio.cambios, {'nombre': ['Evento', 'Renombrado']})
+
+
+class OcupacionTests(DatosBase):
+    def test_respeta_el_horario_de_verano_de_cada_evento(self):
+        # Nueva York cambia de horario el 9 de marzo de 2025; ambos eventos son a
+        # las 10:00 locales y deben caer en la misma hora del reporte.
+        with timezone.override('America/New_York'):
+            for dia in (date(2025, 3, 3), date(2025, 3, 10)):
+                self.crear_evento(fecha_hora=timezone.make_aware(datetime(dia.year, dia.month, dia.day, 10)))
+            datos = ocupacion_salas(date(2025, 3, 1), date(2025, 3, 14), [self.edificio.id])
+
+        lunes = datos['ocupacion'][0][0]
+        self.assertEqual(datos['total_eventos'], 2)
+        self.assertEqual(lunes[9], 0)
+        self.assertEqual(lunes[10], 100.0)
+        self.assertEqual(lunes[12], 0)
+
+
+class AlcanceEdificioTests(DatosBase):
+    """Un usuario staff del edificio A no debe ver nada del edificio B."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.otro_edificio = Edificio.objects.create(nombre='Edificio B')
+        cls.otra_sala = Sala.objects.create(nombre='Sala B1', edificio=cls.otro_edificio)
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'clave', is_staff=True)
+        cls.staff.user_permissions.add(Permission.objects.get(codename='view_evento'))
+        cls.edificio.usuarios.add(cls.staff)
+
+    def setUp(self):
+        super().setUp()
+        self.propio = self.crear_evento(nombre='Propio')
+        self.ajeno = self.crear_evento(nombre='Ajeno', sala=self.otra_sala)
+        self.client.force_login(self.staff)
+
+    def test_dashboard(self):
+        respuesta = self.client.get('/')
+        self.assertEqual(list(respuesta.context['eventos_manana']), [self.propio])
+
+    def test_calendario(self):
+        respuesta = self.client.get('/calendario/', {'year': self.manana.year, 'month': self.manana.month})
+        eventos = [evento for lista in respuesta.context['eventos_por_dia'].values() for evento in lista]
+        self.assertEqual(eventos, [self.propio])
+
+    def test_formulario_solo_ofrece_salas_propias(self):
+        form = EventoForm(usuario=self.staff)
+        self.assertEqual(list(form.fields['sala'].queryset), [self.sala])
+
+        form = EventoForm({
+            'nombre': 'Intruso', 'fecha_hora': self.manana + timedelta(days=1),
+            'sala': self.otra_sala.id, 'estado': 'programado',
+        }, usuario=self.staff)
+        self.assertIn('sala', form.errors)
+
+    def test_admin(self):
+        respuesta = self.client.get('/admin/eventos/evento/')
+        self.assertEqual(list(respuesta.context['cl'].queryset), [self.propio])
+        # Ni siquiera el filtro lateral muestra el otro edificio.
+        self.assertNotContains(respuesta, 'Edificio B')
+
+        respuesta = self.client.get(f'/admin/eventos/evento/{self.ajeno.id}/change/')
+        self.assertRedirects(respuesta, '/admin/')
+
+    def test_resumen_por_sala_solo_incluye_sus_edificios(self):
+        resumen = next(
+            resumen for resumen in construir_resumenes(self.manana.date())
+            if resumen['por_sala'] and resumen['destinatario'] == 'staff@example.com'
+        )
+        self.assertEqual([titulo for titulo, _eventos in resumen['grupos']], ['Sala A1'])
+
+    def test_superusuario_recibe_todos_los_edificios(self):
+        resumen = next(
+            resumen for resumen in construir_resumenes(self.manana.date())
+            if resumen['por_sala'] and resumen['destinatario'] == 'admin@example.com'
+        )
+        self.assertEqual(
+            [titulo for titulo, _eventos in resumen['grupos']],
+            ['Edificio A · Sala A1', 'Edificio B · Sala B1'],
+        )
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class RecordatoriosTests(DatosBase):
+    DESTINATARIOS = 10000
+    PRESUPUESTO = 10  # segundos, el mismo de benchmark_recordatorios
+
+    def test_diez_mil_resumenes_dentro_del_presupuesto_y_sin_repetir(self):
+        User.objects.filter(pk=self.admin.pk).update(email='')
+        creadores = User.objects.bulk_create(
+            User(username=f'usuario{i}', email=f'usuario{i}@example.com', password='!')
+            for i in range(self.DESTINATARIOS)
+        )
+        Evento.objects.bulk_create(
+            Evento(
+                nombre=f'Evento {i}', sala=self.sala, edificio=self.edificio, creado_por=creador,
+                fecha_hora=self.manana + timedelta(minutes=i % 600),
+            )
+            for i, creador in enumerate(creadores)
+        )
+        fecha = self.manana.date()
+
+        inicio = time.perf_counter()
+        enviados = enviar_resumenes(construir_resumenes(fecha), fecha)
+        duracion = time.perf_counter() - inicio
+
+        self.assertEqual(enviados, self.DESTINATARIOS)
+        self.assertEqual(len(mail.outbox), self.DESTINATARIOS)
+        self.assertLess(duracion, self.PRESUPUESTO)
+        # Las marcas de RecordatorioEnviado evitan reenviar en la segunda ejecución.
+        self.assertEqual(enviar_resumenes(construir_resumenes(fecha), fecha), 0)
+        self.assertEqual(len(mail.outbox), self.DESTINATARIOS)
+
+
+class InvalidacionUsuarioTests(DatosBase):
+    """Las señales deben borrar la copia en caché del usuario de CacheModelBackend."""
+
+    def setUp(self):
+        super().setUp()
+        self.usuario = User.objects.create_user('gestor')
+        self.grupo = Group.objects.create(name='Gestor de Eventos')
+        self.cache = caches[CACHE_ALIAS]
+        self.cache.clear()
+
+    def assertInvalida(self, cambio):
+        CacheModelBackend().get_user(self.usuario.pk)
+        self.assertIsNotNone(self.cache.get(clave_usuario(self.usuario.pk)))
+        cambio()
+        self.assertIsNone(self.cache.get(clave_usuario(self.usuario.pk)))
+
+    def test_guardar_usuario(self):
+        self.assertInvalida(self.usuario.save)
+
+    def test_grupos_desde_el_usuario(self):
+        self.assertInvalida(lambda: self.usuario.groups.add(self.grupo))
+        self.assertInvalida(lambda: self.usuario.groups.remove(self.grupo))
+
+    def test_grupos_desde_el_grupo(self):
+        self.assertInvalida(lambda: self.grupo.user_set.add(self.usuario))
+        self.assertInvalida(self.grupo.user_set.clear)
+
+    def test_borrar_grupo(self):
+        self.grupo.user_set.add(self.usuario)
+        self.assertInvalida(self.grupo.delete)
+
+    def test_edificios_del_usuario(self):
+        self.assertInvalida(lambda: self.edificio.usuarios.add(self.usuario))
+        self.assertInvalida(lambda: self.usuario.edificios.remove(self.edificio))
+        self.assertEqual(CacheModelBackend().get_user(self.usuario.pk).ids_edificios, frozenset())
+
+
+class KioscoTests(DatosBase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Sala.objects.filter(pk=cls.sala.pk).update(token_kiosco='token-secreto')
+        cls.url = f'/kiosco/{cls.sala.id}/estado/'
+
+    def setUp(self):
+        super().setUp()
+        cache.delete(clave_cache(self.sala.id))
+        self.client.logout()
+
+    def test_token_valido(self):
+        respuesta = self.client.get(self.url, {'token': 'token-secreto'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta['ETag'])
+        self.assertEqual(respuesta['Cache-Control'], 'private, max-age=15')
+
+        respuesta = self.client.get(self.url, {'token': 'token-secreto'}, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_token_incorrecto_o_ausente(self):
+        for parametros in ({'token': 'otro'}, {'token': 'é'}, {}):
+            with self.subTest(parametros=parametros):
+                self.assertEqual(self.client.get(self.url, parametros).status_code, 403)
+
+    def test_sesion_de_otro_edificio(self):
+        gestor = User.objects.create_user('gestor_b', is_staff=True)
+        Edificio.objects.create(nombre='Edificio B').usuarios.add(gestor)
+        self.client.force_login(gestor)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.edificio.usuarios.add(gestor)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_guardar_un_evento_invalida_la_sala(self):
+        self.client.get(self.url, {'token': 'token-secreto'})
+        self.assertIsNotNone(cache.get(clave_cache(self.sala.id)))
+        self.crear_evento()
+        self.assertIsNone(cache.get(clave_cache(self.sala.id)))
+
+
+class DisponibilidadTests(DatosBase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_empaquetar(self):
+        self.assertEqual(empaquetar([(0, 5)])[:2], bytes([0x80, 0]))
+        # Un bloque cuenta si el intervalo ocupa parte de él.
+        self.assertEqual(empaquetar([(3, 12)])[:2], bytes([0xE0, 0]))
+        # Los intervalos se recortan a los límites del día.
+        self.assertEqual(empaquetar([(-60, 10)])[:1], bytes([0xC0]))
+        self.assertEqual(empaquetar([(1430, 1500)])[-1:], bytes([0x03]))
+
+    def mapa(self, fecha, **kwargs):
+        return base64.b64decode(mapas_del_dia(fecha, [self.sala.id], **kwargs)[self.sala.id])
+
+    def test_evento_del_dia_anterior_ocupa_la_madrugada(self):
+        dia = self.manana.date()
+        self.crear_evento(fecha_hora=self.manana.replace(hour=23))
+        # 23:00 + 1 h 58 min: ocupa hasta la 00:58 del día siguiente (12 bloques).
+        self.assertEqual(self.mapa(dia + timedelta(days=1))[:2], bytes([0xFF, 0xF0]))
+
+    def test_excluir_evento(self):
+        evento = self.crear_evento()
+        otro = self.crear_evento(fecha_hora=self.manana + timedelta(hours=3))
+        dia = self.manana.date()
+
+        self.assertNotEqual(self.mapa(dia), self.mapa(dia, excluir_evento=evento.id))
+        self.assertEqual(self.mapa(dia, excluir_evento=evento.id), empaquetar([(13 * 60, 13 * 60 + 118)]))
+        self.assertEqual(self.mapa(dia, excluir_evento=otro.id), empaquetar([(10 * 60, 10 * 60 + 118)]))
+
+    def test_guardar_un_evento_invalida_el_mapa(self):
+        dia = self.manana.date()
+        self.assertEqual(self.mapa(dia), bytes(36))
+        self.crear_evento()
+        self.assertNotEqual(self.mapa(dia), bytes(36))
+
+
+class ArchivarEventosTests(DatosBase):
+    def setUp(self):
+        super().setUp()
+        antes = timezone.now() - timedelta(days=100)
+        self.finalizado = self.crear_evento(estado='finalizado', fecha_hora=antes)
+        self.cancelado = self.crear_evento(estado='cancelado', fecha_hora=antes + timedelta(hours=3))
+        self.programado = self.crear_evento(estado='programado', fecha_hora=antes + timedelta(hours=6))
+        self.reciente = self.crear_evento(estado='finalizado', fecha_hora=timezone.now() - timedelta(days=10))
+
+    def archivar(self, *args):
+        call_command('archivar_eventos', '--dias', '90', *args, stdout=StringIO())
+
+    def test_mueve_los_eventos_antiguos_con_su_id(self):
+        laptop = Equipo.objects.create(tipo='laptop', numero='L1')
+        AsignacionEquipo.objects.create(
+            evento=self.finalizado, equipo=laptop,
+            inicio=self.finalizado.fecha_hora, fin=self.finalizado.fecha_hora + DURACION_EVENTO,
+        )
+
+        self.archivar()
+
+        archivados = {archivado.id: archivado for archivado in EventoArchivado.objects.all()}
+        self.assertEqual(set(archivados), {self.finalizado.id, self.cancelado.id})
+        self.assertEqual(archivados[self.finalizado.id].nombre, self.finalizado.nombre)
+        self.assertEqual(archivados[self.finalizado.id].equipos, [{'tipo': 'laptop', 'numero': 'L1'}])
+        self.assertEqual(archivados[self.cancelado.id].equipos, [])
+        self.assertEqual(
+            set(Evento.objects.values_list('id', flat=True)), {self.programado.id, self.reciente.id}
+        )
+
+    def test_dry_run_no_escribe(self):
+        self.archivar('--dry-run')
+        self.assertFalse(EventoArchivado.objects.exists())
+        self.assertEqual(Evento.objects.count(), 4)
+
+    def test_id_ya_archivado_revierte_el_lote(self):
+        EventoArchivado.objects.create(
+            id=self.cancelado.id, nombre='Copia previa', fecha_hora=self.cancelado.fecha_hora,
+            sala=self.sala, estado='cancelado', creado_por=self.admin, fecha_creacion=timezone.now(),
+        )
+
+        with self.assertRaises(IntegrityError):
+            self.archivar()
+
+        # Ningún evento del lote se borró ni quedó archivado a medias.
+        self.assertEqual(list(EventoArchivado.objects.values_list('nombre', flat=True)), ['Copia previa'])
+        self.assertEqual(Evento.objects.count(), 4)
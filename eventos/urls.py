@@ -6,12 +6,19 @@ urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('crear/', views.crear_evento, name='crear_evento'),
     path('editar/<int:evento_id>/', views.editar_evento, name='editar_evento'),
+    path('historial/<int:evento_id>/', views.historial_evento, name='historial_evento'),
+    path('salas/disponibilidad/', views.disponibilidad_salas, name='disponibilidad_salas'),
     path('calendario/', views.calendario_eventos, name='calendario'),
     path('estadisticas/', views.estadisticas, name='estadisticas'),
+    path('estadisticas/ocupacion/', views.ocupacion_salas, name='ocupacion_salas'),
     path('finalizar/<int:evento_id>/', views.finalizar_evento, name='finalizar_evento'),
+    path('eventos/estado/', views.cambiar_estado_eventos, name='cambiar_estado_eventos'),
     path('notas/', views.notas, name='notas'),
     path('notas/crear/', views.crear_nota, name='crear_nota'),
+    path('notas/<int:nota_id>/contenido/', views.contenido_nota, name='contenido_nota'),
     path('notas/editar/<int:nota_id>/', views.editar_nota, name='editar_nota'),
     path('notas/eliminar/<int:nota_id>/', views.eliminar_nota, name='eliminar_nota'),
+    path('kiosco/<int:sala_id>/', views.kiosco_sala, name='kiosco_sala'),
+    path('kiosco/<int:sala_id>/estado/', views.kiosco_estado, name='kiosco_estado'),
     path('imprimir-manana/', views.imprimir_eventos_manana, name='imprimir_eventos_manana'),
 ]
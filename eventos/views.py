@@ -1,13 +1,28 @@
-from datetime import timedelta
+import secrets
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import Counter
+from datetime import datetime, time, timedelta
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib.auth.views import LoginView
 from django.utils import timezone
-from django.http import HttpResponse
+from django.db.models import Q
+from django.db.models.functions import Length, Substr
+from django.template.loader import render_to_string
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotModified, JsonResponse
+from django.views.decorators.http import require_GET, require_POST
 from django.urls import reverse, reverse_lazy
-from .models import Evento, Nota, Sala
+from .models import DURACION_CONFLICTO, CambioEvento, Evento, EventoArchivado, Nota, Sala
 from .forms import EventoForm, NotaForm
+from .equipos import liberar_equipos, reasignar_equipos
+from .backends import nombres_grupos
+from .auditoria import diferencias, instantanea
+from .kiosco import estado_sala
+from .disponibilidad import MINUTOS_BLOQUE, mapas_del_dia
+from .estados import TRANSICIONES_MASIVAS, actualizar_estados_eventos, cambiar_estado_condicional, ids_en_conflicto
+from .edificios import edificios_usuario, filtrar_por_edificio
 
 def es_admin(user):
     """Verifica si el usuario es superusuario o staff."""
@@ -15,7 +30,20 @@ def es_admin(user):
 
 def es_gestor_o_admin(user):
     """Verifica si el usuario es admin o pertenece al grupo 'Gestor de Eventos'."""
-    return es_admin(user) or user.groups.filter(name='Gestor de Eventos').exists()
+    return es_admin(user) or 'Gestor de Eventos' in nombres_grupos(user)
+
+def eventos_usuario(user):
+    """Eventos de los edificios del usuario."""
+    return filtrar_por_edificio(Evento.objects.all(), user)
+
+def salas_usuario(user):
+    """Salas activas de los edificios del usuario."""
+    return filtrar_por_edificio(Sala.objects.filter(activa=True).select_related('edificio'), user)
+
+def rango_dia(fecha):
+    """Inicio y fin de ``fecha`` en hora local, para filtrar por rango sobre los índices."""
+    inicio = timezone.make_aware(datetime.combine(fecha, time.min))
+    return inicio, inicio + timedelta(days=1)
 
 
 class CustomLoginView(LoginView):
@@ -25,25 +53,6 @@ class CustomLoginView(LoginView):
     def get_success_url(self):
         return reverse_lazy('dashboard') + '?welcome=1'
 
-def actualizar_estados_eventos():
-    """Actualiza automáticamente los estados de los eventos"""
-    ahora = timezone.localtime()
-    
-    # Cambiar eventos programados a activo cuando empiecen
-    eventos_a_iniciar = Evento.objects.filter(
-        fecha_hora__lte=ahora,
-        estado='programado'
-    )
-    eventos_a_iniciar.update(estado='activo')
-    
-    # Cambiar eventos activos a finalizado después de 2 horas
-    hace_2_horas = ahora - timedelta(hours=2)
-    eventos_a_finalizar = Evento.objects.filter(
-        fecha_hora__lte=hace_2_horas,
-        estado='activo'
-    )
-    eventos_a_finalizar.update(estado='finalizado')
-
 @login_required
 def dashboard(request):
     # Si el usuario no es admin (superusuario/staff), redirigirlo al calendario.
@@ -51,30 +60,38 @@ def dashboard(request):
         return redirect('calendario')
 
 
-    # Actualizar estados automáticamente
-    actualizar_estados_eventos()
+    # Actualizar estados automáticamente (solo en los edificios del usuario)
+    actualizar_estados_eventos(edificios_usuario(request.user))
     
     hoy = timezone.localdate()
     ahora = timezone.localtime()
     manana = hoy + timedelta(days=1)
+    inicio_hoy, fin_hoy = rango_dia(hoy)
+    fin_manana = fin_hoy + timedelta(days=1)
+
+    # Solo los eventos de los edificios del usuario (índice edificio, estado, fecha_hora)
+    eventos = eventos_usuario(request.user)
 
     # Eventos activos (todos los eventos con estado activo)
-    eventos_encurso = Evento.objects.filter(
+    eventos_encurso = eventos.filter(
         estado='activo'
     ).order_by('fecha_hora')
 
-    eventos_hoy = Evento.objects.filter(
-        fecha_hora__date=hoy, 
+    eventos_hoy = eventos.filter(
+        fecha_hora__gte=inicio_hoy,
+        fecha_hora__lt=fin_hoy,
         estado='programado'
     ).order_by('fecha_hora')
     
-    eventos_manana = Evento.objects.filter(
-        fecha_hora__date=manana, 
+    eventos_manana = eventos.filter(
+        fecha_hora__gte=fin_hoy,
+        fecha_hora__lt=fin_manana,
         estado='programado'
     ).order_by('fecha_hora')
     
-    eventos_finalizados_hoy = Evento.objects.filter(
-        fecha_hora__date=hoy, 
+    eventos_finalizados_hoy = eventos.filter(
+        fecha_hora__gte=inicio_hoy,
+        fecha_hora__lt=fin_hoy,
         estado='finalizado'
     ).order_by('-fecha_hora')
 
@@ -99,61 +116,99 @@ def estadisticas(request):
     inicio_semana = hoy - timedelta(days=hoy.weekday())
     fin_semana = inicio_semana + timedelta(days=6)
     
-    eventos_semana = Evento.objects.filter(
-        fecha_hora__date__range=[inicio_semana, fin_semana]
-    )
+    # La semana puede incluir eventos ya archivados, así que se leen ambas tablas
+    # y se agrupan en memoria (solo tres columnas por evento).
+    rango_semana = {'fecha_hora__date__range': [inicio_semana, fin_semana]}
+    campos = ('fecha_hora', 'estado', 'sala__nombre')
+    eventos_semana = list(eventos_usuario(request.user).filter(**rango_semana).values_list(*campos))
+    eventos_semana += filtrar_por_edificio(
+        EventoArchivado.objects.filter(**rango_semana), request.user, 'sala__edificio'
+    ).values_list(*campos)
     
     # Contar eventos por día de la semana
     dias_semana = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
     eventos_por_dia = [0] * 7
     
-    for evento in eventos_semana:
-        dia_semana = evento.fecha_hora.weekday()
+    for fecha_hora, _estado, _sala in eventos_semana:
+        dia_semana = timezone.localtime(fecha_hora).weekday()
         eventos_por_dia[dia_semana] += 1
     
     # Contar eventos por estado
+    conteo_estados = Counter(estado for _fecha, estado, _sala in eventos_semana)
     estados_count = {
-        'programado': eventos_semana.filter(estado='programado').count(),
-        'activo': eventos_semana.filter(estado='activo').count(),
-        'finalizado': eventos_semana.filter(estado='finalizado').count(),
-        'cancelado': eventos_semana.filter(estado='cancelado').count(),
+        'programado': conteo_estados['programado'],
+        'activo': conteo_estados['activo'],
+        'finalizado': conteo_estados['finalizado'],
+        'cancelado': conteo_estados['cancelado'],
     }
     
     # Eventos por sala
-    from django.db.models import Count
-    eventos_por_sala = list(Evento.objects.filter(
-        fecha_hora__date__range=[inicio_semana, fin_semana]
-    ).values('sala__nombre').annotate(total=Count('id')).order_by('-total'))
+    conteo_salas = Counter(sala for _fecha, _estado, sala in eventos_semana)
+    eventos_por_sala = [
+        {'sala__nombre': sala, 'total': total}
+        for sala, total in conteo_salas.most_common()
+    ]
 
     context = {
         'dias_semana': dias_semana,
         'eventos_por_dia': eventos_por_dia,
         'estados_count': estados_count,
         'eventos_por_sala': eventos_por_sala,
-        'total_eventos_semana': eventos_semana.count(),
+        'total_eventos_semana': len(eventos_semana),
     }
     return render(request, 'eventos/estadisticas.html', context)
 
 
 
 
+@login_required
+@user_passes_test(es_admin)
+def ocupacion_salas(request):
+    # NumPy solo se carga cuando se consulta este reporte.
+    from datetime import date
+    from .analitica import ocupacion_salas as calcular_ocupacion_salas
+
+    hoy = timezone.localdate()
+    try:
+        desde = date.fromisoformat(request.GET.get('desde') or '')
+    except ValueError:
+        desde = hoy - timedelta(days=90)
+    try:
+        hasta = date.fromisoformat(request.GET.get('hasta') or '')
+    except ValueError:
+        hasta = hoy
+    if desde > hasta:
+        desde, hasta = hasta, desde
+
+    context = {
+        'desde': desde,
+        'hasta': hasta,
+        'datos': calcular_ocupacion_salas(desde, hasta, edificios_usuario(request.user)),
+        'dias_semana': ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo'],
+    }
+    return render(request, 'eventos/ocupacion.html', context)
+
 @login_required
 @user_passes_test(es_gestor_o_admin)
 def crear_evento(request):
     if request.method == 'POST':
-        form = EventoForm(request.POST)
+        form = EventoForm(request.POST, usuario=request.user)
         if form.is_valid():
             evento = form.save(commit=False)
             evento.creado_por = request.user
             evento.save()
+            form.save_m2m()
+            request.auditoria.registrar(
+                evento.id, 'crear', diferencias({}, instantanea(evento)), usuario=request.user
+            )
             if es_admin(request.user):
                 return redirect('dashboard')
             else:
                 return redirect('calendario') # Este ya estaba bien, pero lo confirmo
     else:
-        form = EventoForm()
+        form = EventoForm(usuario=request.user)
     
-    salas_disponibles = Sala.objects.filter(activa=True)
+    salas_disponibles = salas_usuario(request.user)
     context = {'form': form, 'salas_disponibles': salas_disponibles}
     
     return render(request, 'eventos/crear_evento.html', context)
@@ -161,19 +216,23 @@ def crear_evento(request):
 @login_required
 @user_passes_test(es_gestor_o_admin)
 def editar_evento(request, evento_id):
-    evento = get_object_or_404(Evento, id=evento_id)
+    evento = get_object_or_404(eventos_usuario(request.user), id=evento_id)
     if request.method == 'POST':
-        form = EventoForm(request.POST, instance=evento)
+        antes = instantanea(evento)
+        form = EventoForm(request.POST, instance=evento, usuario=request.user)
         if form.is_valid():
             form.save()
+            cambios = diferencias(antes, instantanea(evento))
+            if cambios:
+                request.auditoria.registrar(evento.id, 'editar', cambios, usuario=request.user)
             if es_admin(request.user):
                 return redirect('dashboard')
             else:
                 return redirect('calendario') # Este también estaba bien
     else:
-        form = EventoForm(instance=evento)
+        form = EventoForm(instance=evento, usuario=request.user)
         
-    salas_disponibles = Sala.objects.filter(activa=True) # Se mantiene para el formulario
+    salas_disponibles = salas_usuario(request.user) # Se mantiene para el formulario
     context = {
         'form': form, 
         'evento': evento,
@@ -181,6 +240,30 @@ def editar_evento(request, evento_id):
     }
     return render(request, 'eventos/editar_evento.html', context)
 
+@login_required
+@user_passes_test(es_gestor_o_admin)
+def historial_evento(request, evento_id):
+    """Bitácora paginada de un evento (también de eventos ya archivados)."""
+    evento = (
+        eventos_usuario(request.user).filter(id=evento_id).first()
+        or filtrar_por_edificio(
+            EventoArchivado.objects.filter(id=evento_id), request.user, 'sala__edificio'
+        ).first()
+    )
+    cambios = CambioEvento.objects.filter(evento_id=evento_id).select_related('usuario')
+    # La bitácora de un evento eliminado solo la ven quienes ven todos los edificios.
+    if evento is None and (edificios_usuario(request.user) is not None or not cambios.exists()):
+        raise Http404("Evento no encontrado")
+
+    pagina = Paginator(cambios, 20).get_page(request.GET.get('page'))
+    context = {
+        'evento': evento,
+        'evento_id': evento_id,
+        'pagina': pagina,
+        'editable': isinstance(evento, Evento),
+    }
+    return render(request, 'eventos/historial_evento.html', context)
+
 @login_required
 @user_passes_test(es_gestor_o_admin)
 def calendario_eventos(request):
@@ -200,10 +283,12 @@ def calendario_eventos(request):
     # Crear calendario del mes
     cal = calendar.monthcalendar(año, mes)
     
-    # Obtener eventos del mes
-    eventos_mes = Evento.objects.filter(
-        fecha_hora__year=año,
-        fecha_hora__month=mes
+    # Obtener eventos del mes (de los edificios del usuario)
+    inicio_mes = rango_dia(date(año, mes, 1))[0]
+    fin_mes = rango_dia(date(año + mes // 12, mes % 12 + 1, 1))[0]
+    eventos_mes = eventos_usuario(request.user).filter(
+        fecha_hora__gte=inicio_mes,
+        fecha_hora__lt=fin_mes
     )
     
     # Agrupar eventos por día (convertir a zona horaria local)
@@ -249,16 +334,212 @@ def calendario_eventos(request):
 @login_required
 @user_passes_test(es_admin)
 def finalizar_evento(request, evento_id):
-    evento = get_object_or_404(Evento, id=evento_id)
+    evento = get_object_or_404(eventos_usuario(request.user), id=evento_id)
+    estado_anterior = evento.estado
     evento.estado = 'finalizado'
     evento.save()
+    request.auditoria.registrar(
+        evento.id, 'finalizar', {'estado': [estado_anterior, 'finalizado']}, usuario=request.user
+    )
     return redirect('dashboard')
 
+@login_required
+@user_passes_test(es_admin)
+@require_POST
+def cambiar_estado_eventos(request):
+    """Finaliza, cancela o reactiva varios eventos a la vez (llamada AJAX del dashboard)."""
+    accion = request.POST.get('accion')
+    if accion not in TRANSICIONES_MASIVAS:
+        return JsonResponse({'error': 'Acción no válida.'}, status=400)
+    try:
+        ids = {int(valor) for valor in request.POST.getlist('ids')}
+    except ValueError:
+        return JsonResponse({'error': 'Identificadores de evento no válidos.'}, status=400)
+
+    estados_origen, estado_destino = TRANSICIONES_MASIVAS[accion]
+    # Estados previos: sirven para la bitácora y para distinguir los eventos
+    # que no cambiaron de los que no existen (o son de otro edificio).
+    estados_previos = dict(eventos_usuario(request.user).filter(id__in=ids).values_list('id', 'estado'))
+    # Al reactivar se aplica la misma revisión de choques de horario que el
+    # formulario y se vuelven a asignar los equipos liberados al cancelar.
+    candidatos = []
+    conflictos = set()
+    sin_equipo = set()
+    if estado_destino == 'programado':
+        candidatos = [evento_id for evento_id, estado in estados_previos.items() if estado in estados_origen]
+        conflictos = ids_en_conflicto(candidatos)
+        candidatos = [evento_id for evento_id in candidatos if evento_id not in conflictos]
+        sin_equipo = reasignar_equipos(Evento.objects.filter(id__in=candidatos))
+    actualizados = cambiar_estado_condicional(
+        [evento_id for evento_id in estados_previos if evento_id not in conflictos and evento_id not in sin_equipo],
+        estados_origen, estado_destino,
+    )
+    if estado_destino == 'cancelado':
+        liberar_equipos(actualizados)
+    elif estado_destino == 'programado':
+        # Un evento al que se le asignaron equipos pero que el UPDATE no
+        # reactivó no debe retenerlos.
+        liberar_equipos(Evento.objects.filter(
+            id__in=set(candidatos) - sin_equipo - actualizados, estado__in=estados_origen
+        ).values('id'))
+    request.auditoria.registrar_transicion(
+        {evento_id: estados_previos.get(evento_id) for evento_id in actualizados},
+        estado_destino, accion, usuario=request.user,
+    )
+
+    resultados = {}
+    for evento_id in sorted(ids):
+        if evento_id in actualizados:
+            resultados[evento_id] = 'actualizado'
+        elif evento_id in conflictos:
+            resultados[evento_id] = 'conflicto'
+        elif evento_id in sin_equipo:
+            resultados[evento_id] = 'sin_equipo'
+        elif evento_id in estados_previos:
+            resultados[evento_id] = 'sin_cambio'
+        else:
+            resultados[evento_id] = 'no_encontrado'
+
+    return JsonResponse({
+        'estado': estado_destino,
+        'actualizados': sorted(actualizados),
+        'resultados': resultados,
+    })
+
+@login_required
+@user_passes_test(es_gestor_o_admin)
+@require_GET
+def disponibilidad_salas(request):
+    """Mapa de ocupación del día por sala para avisar de choques en el formulario."""
+    try:
+        fecha = datetime.strptime(request.GET.get('fecha', ''), '%Y-%m-%d').date()
+        excluir = int(request.GET['excluir']) if request.GET.get('excluir') else None
+    except ValueError:
+        return JsonResponse({'error': 'Parámetros inválidos'}, status=400)
+
+    sala_ids = list(salas_usuario(request.user).values_list('id', flat=True))
+    return JsonResponse({
+        'fecha': fecha.isoformat(),
+        'minutos_por_bloque': MINUTOS_BLOQUE,
+        'duracion_minutos': int(DURACION_CONFLICTO.total_seconds() // 60),
+        'salas': mapas_del_dia(fecha, sala_ids, excluir_evento=excluir),
+    })
+
+def acceso_kiosco(request, datos_sala):
+    """Permite el acceso con el token de solo lectura de la sala o con una sesión de gestor."""
+    token = request.GET.get('token') or request.headers.get('X-Kiosco-Token', '')
+    # Se comparan bytes: compare_digest rechaza cadenas con caracteres no ASCII.
+    if token and datos_sala['token'] and secrets.compare_digest(token.encode(), datos_sala['token'].encode()):
+        return True
+    if not (request.user.is_authenticated and es_gestor_o_admin(request.user)):
+        return False
+    edificios = edificios_usuario(request.user)
+    return edificios is None or datos_sala.get('edificio') in edificios
+
+@require_GET
+def kiosco_sala(request, sala_id):
+    """Pantalla para la tableta de la sala; consulta kiosco_estado periódicamente."""
+    datos = estado_sala(sala_id)
+    if datos is None:
+        raise Http404("Sala no encontrada")
+    if not acceso_kiosco(request, datos):
+        return HttpResponseForbidden("Acceso no autorizado")
+    context = {
+        'sala_id': sala_id,
+        'sala_nombre': datos['nombre'],
+        'token': request.GET.get('token', ''),
+    }
+    return render(request, 'eventos/kiosco.html', context)
+
+@require_GET
+def kiosco_estado(request, sala_id):
+    """Evento actual y siguiente de la sala en JSON, con ETag para responder 304."""
+    datos = estado_sala(sala_id)
+    if datos is None:
+        raise Http404("Sala no encontrada")
+    if not acceso_kiosco(request, datos):
+        return HttpResponseForbidden("Acceso no autorizado")
+
+    if datos['etag'] in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(datos['json'], content_type='application/json')
+    response['ETag'] = datos['etag']
+    response['Cache-Control'] = 'private, max-age=15'
+    return response
+
+NOTAS_POR_PAGINA = 24
+LONGITUD_EXTRACTO = 200
+
+def es_peticion_json(request):
+    """Las llamadas del tablero de notas piden JSON; los enlaces normales, HTML."""
+    return 'application/json' in request.headers.get('Accept', '')
+
+def codificar_cursor(nota):
+    valor = f"{nota.fecha_modificacion.isoformat()}|{nota.id}"
+    return urlsafe_b64encode(valor.encode()).decode()
+
+def decodificar_cursor(cursor):
+    try:
+        fecha, nota_id = urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(fecha), int(nota_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def notas_resumidas(usuario):
+    """Notas del usuario sin el contenido completo, solo un extracto calculado en la base."""
+    return Nota.objects.filter(creado_por=usuario).defer('contenido').annotate(
+        extracto=Substr('contenido', 1, LONGITUD_EXTRACTO),
+        longitud=Length('contenido'),
+    ).order_by('-fecha_modificacion', '-id')
+
+def pagina_notas(usuario, cursor=None):
+    """Página de notas por cursor (fecha_modificacion, id) sobre el índice compuesto."""
+    notas = notas_resumidas(usuario)
+    posicion = decodificar_cursor(cursor) if cursor else None
+    if posicion:
+        fecha, nota_id = posicion
+        notas = notas.filter(
+            Q(fecha_modificacion__lt=fecha) | Q(fecha_modificacion=fecha, id__lt=nota_id)
+        )
+    notas = list(notas[:NOTAS_POR_PAGINA + 1])
+    siguiente = codificar_cursor(notas[NOTAS_POR_PAGINA - 1]) if len(notas) > NOTAS_POR_PAGINA else None
+    notas = notas[:NOTAS_POR_PAGINA]
+    for nota in notas:
+        nota.truncada = nota.longitud > LONGITUD_EXTRACTO
+    return notas, siguiente
+
+def tarjeta_nota(request, nota_id):
+    nota = notas_resumidas(request.user).get(id=nota_id)
+    nota.truncada = nota.longitud > LONGITUD_EXTRACTO
+    return render_to_string('eventos/_nota_tarjeta.html', {'nota': nota}, request=request)
+
 @login_required
 @user_passes_test(es_admin)
 def notas(request):
-    notas = Nota.objects.filter(creado_por=request.user)
-    return render(request, 'eventos/notas.html', {'notas': notas})
+    notas, siguiente = pagina_notas(request.user, request.GET.get('cursor'))
+    if es_peticion_json(request):
+        html = ''.join(
+            render_to_string('eventos/_nota_tarjeta.html', {'nota': nota}, request=request)
+            for nota in notas
+        )
+        return JsonResponse({'html': html, 'siguiente': siguiente})
+
+    context = {
+        'notas': notas,
+        'siguiente': siguiente,
+        'total_notas': Nota.objects.filter(creado_por=request.user).count(),
+        'colores': Nota.COLOR_CHOICES,
+    }
+    return render(request, 'eventos/notas.html', context)
+
+@login_required
+@user_passes_test(es_admin)
+def contenido_nota(request, nota_id):
+    nota = get_object_or_404(
+        Nota.objects.only('titulo', 'contenido', 'color'), id=nota_id, creado_por=request.user
+    )
+    return JsonResponse({'titulo': nota.titulo, 'contenido': nota.contenido, 'color': nota.color})
 
 @login_required
 @user_passes_test(es_admin)
@@ -269,7 +550,11 @@ def crear_nota(request):
             nota = form.save(commit=False)
             nota.creado_por = request.user
             nota.save()
+            if es_peticion_json(request):
+                return JsonResponse({'id': nota.id, 'html': tarjeta_nota(request, nota.id)})
             return redirect('notas')
+        if es_peticion_json(request):
+            return JsonResponse({'errores': form.errors}, status=400)
     else:
         form = NotaForm()
     return render(request, 'eventos/crear_nota.html', {'form': form})
@@ -282,7 +567,11 @@ def editar_nota(request, nota_id):
         form = NotaForm(request.POST, instance=nota)
         if form.is_valid():
             form.save()
+            if es_peticion_json(request):
+                return JsonResponse({'id': nota.id, 'html': tarjeta_nota(request, nota.id)})
             return redirect('notas')
+        if es_peticion_json(request):
+            return JsonResponse({'errores': form.errors}, status=400)
     else:
         form = NotaForm(instance=nota)
     return render(request, 'eventos/editar_nota.html', {'form': form, 'nota': nota})
@@ -290,9 +579,11 @@ def editar_nota(request, nota_id):
 @login_required
 @user_passes_test(es_admin)
 def eliminar_nota(request, nota_id):
-    nota = get_object_or_404(Nota, id=nota_id, creado_por=request.user)
+    nota = get_object_or_404(Nota.objects.only('id', 'titulo', 'contenido'), id=nota_id, creado_por=request.user)
     if request.method == 'POST':
         nota.delete()
+        if es_peticion_json(request):
+            return JsonResponse({'id': nota_id})
         return redirect('notas')
     return render(request, 'eventos/eliminar_nota.html', {'nota': nota})
 
@@ -302,10 +593,12 @@ def imprimir_eventos_manana(request):
     hoy = timezone.localdate()
     manana = hoy + timedelta(days=1)
     
-    eventos_manana = Evento.objects.filter(
-        fecha_hora__date=manana,
+    inicio_manana, fin_manana = rango_dia(manana)
+    eventos_manana = eventos_usuario(request.user).filter(
+        fecha_hora__gte=inicio_manana,
+        fecha_hora__lt=fin_manana,
         estado='programado'
-    ).order_by('fecha_hora')
+    ).select_related('sala').prefetch_related('asignaciones__equipo').order_by('fecha_hora')
     
     # Formatear fecha en español
     dias_semana = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
@@ -412,12 +705,15 @@ def imprimir_eventos_manana(request):
         for evento in eventos_manana:
             equipamiento_html = ""
             if evento.requiere_laptop or evento.requiere_proyector:
+                asignados = {a.equipo.tipo: a.equipo for a in evento.asignaciones.all()}
                 equipamiento_html = '<div class="card-equipment">'
                 if evento.requiere_laptop:
-                    laptop_info = f"Laptop{' #' + evento.numero_laptop if evento.numero_laptop else ''}"
+                    numero_laptop = asignados['laptop'].numero if 'laptop' in asignados else evento.numero_laptop
+                    laptop_info = f"Laptop{' #' + numero_laptop if numero_laptop else ''}"
                     equipamiento_html += f'<span class="equipment-tag">💻 {laptop_info}</span>'
                 if evento.requiere_proyector:
-                    equipamiento_html += '<span class="equipment-tag">📽️ Proyector</span>'
+                    proyector_info = f"Proyector{' #' + asignados['proyector'].numero if 'proyector' in asignados else ''}"
+                    equipamiento_html += f'<span class="equipment-tag">📽️ {proyector_info}</span>'
                 equipamiento_html += '</div>'
             
             observaciones_html = ""
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,10 +49,26 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'eventos.middleware.AuditoriaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Perfil ligero para comandos por lotes (motor de estados, archivo, recordatorios):
+# DJANGO_PERFIL=lote deja fuera las apps y el middleware que solo usan las vistas
+# web. No sirve para atender peticiones ni para ejecutar migrate.
+APPS_SOLO_WEB = [
+    'django.contrib.admin',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'crispy_forms',
+    'crispy_bootstrap5',
+]
+
+if os.environ.get('DJANGO_PERFIL') == 'lote':
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in APPS_SOLO_WEB]
+    MIDDLEWARE = []
+
 ROOT_URLCONF = 'gestion_eventos_salas.urls'
 
 TEMPLATES = [
@@ -90,6 +107,53 @@ DATABASES = {
 }
 
 
+# Cache
+# Con REDIS_URL definido se usa Redis (compartido entre workers); si no, la
+# caché en memoria del proceso. Sesiones y usuarios usan su propio alias
+# ('sesiones') para que las entradas de disponibilidad y kiosco no los desalojen.
+# CACHE_COMPARTIDA indica si las invalidaciones llegan a todos los workers.
+CACHE_COMPARTIDA = bool(os.environ.get('REDIS_URL'))
+
+if CACHE_COMPARTIDA:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        },
+        'sesiones': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'KEY_PREFIX': 'sesiones',
+        },
+    }
+
+    # Sesiones en caché con respaldo en la base de datos
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    SESSION_CACHE_ALIAS = 'sesiones'
+
+    # El backend con caché evita leer auth_user y auth_group en cada petición.
+    # ModelBackend se mantiene para las sesiones iniciadas antes del cambio.
+    AUTHENTICATION_BACKENDS = [
+        'eventos.backends.CacheModelBackend',
+        'django.contrib.auth.backends.ModelBackend',
+    ]
+else:
+    # Sin caché compartida, cada worker tendría su propia copia de sesiones y
+    # usuarios y las invalidaciones (cierre de sesión, cambio de permisos) no
+    # llegarían a los demás: se usan la sesión en base de datos y ModelBackend.
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            # Por sala: un mapa por día consultado, su versión y el kiosco; el
+            # límite por omisión (300) no alcanza ni para un día de 200 salas.
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+        'sesiones': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'sesiones',
+        },
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 